@@ -0,0 +1,105 @@
+# accounts/avatars.py
+"""
+소셜 프로필 이미지(카카오/네이버 CDN) 가져오기 — 로그인 요청 경로 밖에서 실행.
+- 커넥션 풀/keep-alive를 쓰는 requests.Session 1개를 프로세스에서 공유
+- 일시 오류(연결 실패, 429/5xx)는 지수 백오프로 재시도(urllib3 Retry)
+- 원본을 그대로 두지 않고 정사각형 표준 크기로 줄여 저장
+- 그 사이 사용자가 직접 사진을 올렸으면 덮어쓰지 않음
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import Q
+
+logger = logging.getLogger("accounts")
+
+AVATAR_SIZE = 256                          # 저장 크기(px, 정사각형) — 화면에서는 이걸 줄여서 사용
+AVATAR_MAX_BYTES = 5 * 1024 * 1024         # 이보다 큰 응답은 받지 않음
+FETCH_TIMEOUT = (3, 5)                     # (connect, read) 초
+DEFAULT_AVATAR_NAMES = {"default.jpg", "default.png", "avatars/default.png"}
+
+_fetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="avatar-fetch")
+_session: requests.Session | None = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,                          # 0.5s, 1s, 2s
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+        )
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        s.headers["User-Agent"] = "codingline-avatar/1.0"
+        _session = s
+    return _session
+
+
+def _download(url: str) -> bytes:
+    with _get_session().get(url, timeout=FETCH_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        buf = bytearray()
+        for chunk in resp.iter_content(64 * 1024):
+            buf += chunk
+            if len(buf) > AVATAR_MAX_BYTES:
+                raise ValueError(f"avatar too large (> {AVATAR_MAX_BYTES} bytes)")
+        return bytes(buf)
+
+
+def _resize(raw: bytes) -> tuple[bytes, str]:
+    """가운데 기준 정사각형으로 자르고 AVATAR_SIZE로 축소 → (바이트, 확장자)."""
+    with Image.open(io.BytesIO(raw)) as im:
+        im = ImageOps.exif_transpose(im)
+        has_alpha = "A" in im.getbands()
+        im = ImageOps.fit(im.convert("RGBA" if has_alpha else "RGB"),
+                          (AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+        out = io.BytesIO()
+        if has_alpha:
+            im.save(out, "PNG", optimize=True)
+            return out.getvalue(), "png"
+        im.save(out, "JPEG", quality=85, optimize=True, progressive=True)
+        return out.getvalue(), "jpg"
+
+
+def _no_real_avatar_q() -> Q:
+    return Q(avatar__isnull=True) | Q(avatar="") | Q(avatar__in=DEFAULT_AVATAR_NAMES)
+
+
+def _fetch_and_store(user_id: int, url: str, provider: str) -> None:
+    User = get_user_model()
+    try:
+        data, ext = _resize(_download(url))
+        user = User.objects.filter(pk=user_id).filter(_no_real_avatar_q()).first()
+        if user is None:
+            logger.debug("아바타 저장 스킵: user_id=%s (탈퇴 또는 이미 사진 있음)", user_id)
+            return
+        user.avatar.save(f"{provider}_{user_id}.{ext}", ContentFile(data), save=False)
+        # 다운로드 중에 사용자가 직접 올렸으면 덮어쓰지 않음(조건부 UPDATE)
+        if not User.objects.filter(pk=user_id).filter(_no_real_avatar_q()).update(avatar=user.avatar.name):
+            user.avatar.delete(save=False)
+            logger.debug("아바타 저장 스킵: user_id=%s (처리 중 사용자 사진 등록)", user_id)
+            return
+        logger.info("아바타 저장 완료: user_id=%s, file=%s", user_id, user.avatar.name)
+    except Exception as e:
+        logger.warning("아바타 저장 스킵: user_id=%s, err=%s", user_id, e)
+    finally:
+        connection.close()   # 작업 스레드가 DB 커넥션을 붙잡고 있지 않도록
+
+
+def enqueue_avatar_fetch(user_id: int, url: str, provider: str = "social") -> None:
+    """아바타 다운로드/리사이즈/저장 예약(즉시 반환). 실패는 로그만 남김."""
+    _fetcher.submit(_fetch_and_store, user_id, url, provider)
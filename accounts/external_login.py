@@ -1,6 +1,5 @@
-import json, logging, requests
+import json, logging
 from django.dispatch import receiver
-from django.core.files.base import ContentFile
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils.dateparse import parse_date
@@ -9,6 +8,8 @@ from allauth.account.signals import user_signed_up
 from allauth.socialaccount.signals import social_account_added
 from allauth.socialaccount.models import SocialAccount
 
+from .avatars import enqueue_avatar_fetch, DEFAULT_AVATAR_NAMES
+
 logger = logging.getLogger("accounts")
 User = get_user_model()
 
@@ -90,24 +91,12 @@ def _extract_profile(extra: dict, provider: str | None):
 # 아바타 저장
 # =============================
 def _save_avatar_from_url(user: User, url: str, provider: str = "social"):
-    """이미지 URL 다운로드 → user.avatar 저장. 실패해도 앱 중단 X."""
+    """이미지 URL 다운로드/리사이즈/저장을 백그라운드로 예약(커밋 후) → 로그인 지연이 외부 CDN에 묶이지 않음."""
     if not url:
         logger.debug("아바타 저장 스킵: URL 없음")
         return
-    try:
-        logger.debug("아바타 다운로드 시도: url=%s", url)
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        ext = "jpg"
-        for cand in (".jpg", ".jpeg", ".png", ".webp"):
-            if cand in url.lower():
-                ext = cand.lstrip("."); break
-        filename = f"{provider}_{user.pk}.{ext}"
-        user.avatar.save(filename, ContentFile(resp.content), save=False)
-        user.save(update_fields=["avatar"])
-        logger.info("아바타 저장 완료: user_id=%s, file=%s", user.pk, filename)
-    except Exception as e:
-        logger.warning("아바타 저장 스킵: user_id=%s, err=%s", user.pk, e)
+    logger.debug("아바타 다운로드 예약: user_id=%s, url=%s", user.pk, url)
+    transaction.on_commit(lambda: enqueue_avatar_fetch(user.pk, url, provider))
 
 # =============================
 # extra_data 로딩
@@ -223,7 +212,6 @@ def _fill_profile(user: User, sociallogin, *, set_name_if_empty=False, set_avata
 
     # 5) 아바타(비어있을 때만 저장) — 기본 이미지면 덮어쓰기 허용
     current_name = getattr(getattr(user, "avatar", None), "name", "") or ""
-    DEFAULT_AVATAR_NAMES = {"default.jpg", "default.png", "avatars/default.png"}
     has_real_avatar = bool(current_name) and current_name not in DEFAULT_AVATAR_NAMES
     logger.debug("  - 아바타 현재파일=%r, 실이미지여부=%s", current_name, has_real_avatar)
 
@@ -0,0 +1,67 @@
+# accounts/presence.py
+"""
+사용자별 "활성 WS 채널" 1개 유지(다른 탭/창 접속 시 이전 채널 강제 로그아웃).
+- Redis 캐시 DB에 직접 문자열로 저장: active_ws:user:<id> = channel_name
+- 접속: SET key value EX ttl GET  → 이전 값 읽기 + 새 값 쓰기를 원자적으로 1번에
+        (두 탭이 동시에 붙어도 한쪽이 반드시 상대 채널을 받아 정리 → 경쟁 조건 없음)
+- 종료: 내 채널일 때만 삭제(Lua 비교 후 삭제, 1번 왕복)
+- 비동기 클라이언트(redis.asyncio)라 컨슈머에서 스레드 전환(sync_to_async) 없음
+  (커넥션 풀이 만든 이벤트 루프에 묶이므로 루프마다 따로 만듦 — 테스트/async_to_sync가 새 루프를 띄워도 안전)
+Django cache(pickle 직렬화)를 거치지 않으므로 조회도 반드시 이 모듈 함수로.
+"""
+import asyncio
+import weakref
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+ACTIVE_WS = "active_ws:user:{uid}"
+ACTIVE_WS_TTL = 60 * 60 * 24
+
+_RELEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+_client: Optional[redis.Redis] = None
+
+
+def _url() -> str:
+    return settings.CACHES["default"]["LOCATION"]
+
+
+def _async_client() -> aioredis.Redis:
+    loop = asyncio.get_running_loop()
+    client = _aclients.get(loop)
+    if client is None:
+        client = _aclients[loop] = aioredis.from_url(_url(), decode_responses=True)
+    return client
+
+
+def _sync_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(_url(), decode_responses=True)
+    return _client
+
+
+async def swap_active_channel(user_id: int, channel_name: str) -> Optional[str]:
+    """현재 채널을 활성으로 기록하고 직전 활성 채널을 돌려줌(원자적 GETSET)."""
+    return await _async_client().set(
+        ACTIVE_WS.format(uid=user_id), channel_name, ex=ACTIVE_WS_TTL, get=True
+    )
+
+
+async def release_active_channel(user_id: int, channel_name: str) -> bool:
+    """아직 내 채널이 활성일 때만 지움(그 사이 다른 탭이 바꿨으면 그대로 둠)."""
+    return bool(await _async_client().eval(_RELEASE_LUA, 1, ACTIVE_WS.format(uid=user_id), channel_name))
+
+
+def get_active_channel(user_id: int) -> Optional[str]:
+    """동기 코드(로그인 시그널)용 조회."""
+    return _sync_client().get(ACTIVE_WS.format(uid=user_id))
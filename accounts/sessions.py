@@ -0,0 +1,34 @@
+# accounts/sessions.py
+"""
+세션 엔진: cached_db(Redis 캐시 우선 읽기 + DB 영속) + 쓰기 합치기.
+- 읽기: 캐시 히트면 MySQL SELECT 없음 (HTTP 요청, WS AuthMiddlewareStack 모두)
+- 쓰기: SESSION_SAVE_EVERY_REQUEST=True 여도 "데이터가 바뀌었을 때" 또는
+        "마지막 기록 후 SESSION_TOUCH_INTERVAL이 지나 만료 연장이 필요할 때"만 캐시/DB에 기록
+  → 방 페이지가 폴링하는 JSON API마다 세션 UPDATE가 나가지 않음
+room_access:<id> 같은 플래그는 값을 넣는 순간 modified=True 이므로 즉시 기록됨(동작 동일).
+settings: SESSION_ENGINE = "accounts.sessions"
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+TOUCH_KEY = "_touched"       # 세션 데이터 안에 남기는 마지막 기록 시각(epoch 초)
+
+
+def touch_interval() -> int:
+    # 쿠키 수명보다 충분히 짧아야 서버 쪽 만료가 쿠키보다 먼저 오지 않음
+    return getattr(settings, "SESSION_TOUCH_INTERVAL", 300)
+
+
+class SessionStore(CachedDBStore):
+
+    def _needs_touch(self) -> bool:
+        last = self._get_session().get(TOUCH_KEY, 0)
+        return time.time() - last >= touch_interval()
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key and not self.modified and not self._needs_touch():
+            return                                    # 바뀐 것 없음 + 만료 연장도 아직 불필요 → 쓰기 생략
+        self._get_session()[TOUCH_KEY] = int(time.time())
+        super().save(must_create=must_create)
@@ -1,18 +1,22 @@
 # accounts/signals.py (최소/WS용)
 import logging
-from django.contrib.auth.signals import user_logged_in
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.core.cache import cache
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from logui import log_step
 
+from .presence import get_active_channel
+from .ws_auth import forget_profile, revoke_tokens
+
 logger = logging.getLogger("accounts")
-ACTIVE_WS = "active_ws:user:{uid}"
 
 @receiver(user_logged_in)
 def on_login(sender, user, request, **kwargs):
-    prev = cache.get(ACTIVE_WS.format(uid=user.id))
+    revoke_tokens(user.id)          # 다른 탭/기기에 발급된 WS 토큰도 강제 로그아웃과 함께 무효
+    prev = get_active_channel(user.id)
     log_step(logger, "로그인 감지", "signals.on_login", {"user": user.id, "prev_chan": prev})
     if prev:
         async_to_sync(get_channel_layer().send)(prev, {
@@ -20,3 +24,15 @@ def on_login(sender, user, request, **kwargs):
             "reason": "다른 곳에서 로그인되었습니다.",
         })
         log_step(logger, "강제 로그아웃 전송", "channel_layer.send", {"to": prev})
+
+
+@receiver(user_logged_out)
+def on_logout(sender, user, request, **kwargs):
+    if user is not None:
+        revoke_tokens(user.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def on_user_saved(sender, instance, **kwargs):
+    # 이름/활성 여부/비밀번호(세션 해시)가 바뀌면 WS 토큰 인증용 캐시 프로필 폐기(다음 접속 때 다시 채움)
+    forget_profile(instance.pk)
@@ -1,3 +1,39 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from accounts.sessions import TOUCH_KEY, SessionStore
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, SESSION_TOUCH_INTERVAL=300)
+class CoalescingSessionStoreTests(TestCase):
+    def _saved_session(self, now=1_000_000):
+        s = SessionStore()
+        s["k"] = "v"
+        with mock.patch("accounts.sessions.time.time", return_value=now):
+            s.save()
+        return SessionStore(session_key=s.session_key)
+
+    def test_unmodified_save_within_interval_is_skipped(self):
+        s = self._saved_session()
+        self.assertEqual(s["k"], "v")                  # 캐시에서 읽음
+        with mock.patch("accounts.sessions.time.time", return_value=1_000_000 + 299):
+            with self.assertNumQueries(0):
+                s.save()
+        self.assertEqual(s[TOUCH_KEY], 1_000_000)
+
+    def test_unmodified_save_after_interval_touches(self):
+        s = self._saved_session()
+        s.load()
+        with mock.patch("accounts.sessions.time.time", return_value=1_000_000 + 300):
+            s.save()
+        self.assertEqual(SessionStore(session_key=s.session_key)[TOUCH_KEY], 1_000_000 + 300)
+
+    def test_modified_session_is_written_immediately(self):
+        s = self._saved_session()
+        s["room_access:1"] = True
+        with mock.patch("accounts.sessions.time.time", return_value=1_000_000 + 1):
+            s.save()
+        self.assertTrue(SessionStore(session_key=s.session_key)["room_access:1"])
@@ -11,6 +11,7 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.views.generic import FormView
 
+from config.db_router import replica_view
 from .forms import UsernameFindForm, PasswordResetVerifyForm, PasswordResetSetForm, ProfileUpdateForm
 
 
@@ -64,6 +65,7 @@ class CustomSocialSignupView(AllauthSocialSignupView):
         return ctx
     
     @login_required
+    @replica_view
     def mypage(request):
         user = request.user
         if request.method == 'POST':
@@ -0,0 +1,125 @@
+# accounts/ws_auth.py
+"""
+WS 접속 토큰 인증 (방 페이지가 발급하는 짧은 수명의 서명 토큰).
+- 방 페이지 렌더 시 issue_ws_token(user, slug) → 템플릿이 WS URL에 ?wst=<토큰> 으로 붙임
+- 토큰에 묶인 것: 사용자 id, 방 slug(다른 방 소켓에는 못 씀), 발급 시각, 세션 인증 해시(get_session_auth_hash)
+- WsTokenAuthMiddleware: 토큰 서명/만료 + slug(scope path) 확인 → 캐시의 최소 프로필로 scope["user"] 구성
+    · 프로필 = {id, username, is_active, session_hash} → DB 조회 없이 만든 User 인스턴스(pk 있음 → ORM 필터/FK에 그대로 사용)
+    · 캐시 미스일 때만 values() 1번 조회 후 캐시
+    · 비밀번호 변경 → 세션 해시가 바뀌어 예전 토큰 거절(세션 인증과 같은 규칙)
+    · 로그아웃/다른 곳 로그인(강제 로그아웃) → revoke_tokens()로 그 전에 발급된 토큰 거절
+- 토큰이 없거나 만료/위조/불일치면 기존 AuthMiddlewareStack(세션 → User 로드)으로 그대로 처리
+재접속 폭주가 세션/유저 조회 폭주로 MySQL에 번지지 않게 하는 것이 목적.
+"""
+import logging
+import re
+import time
+from typing import Optional
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+
+logger = logging.getLogger("accounts")
+
+WS_TOKEN_PARAM = "wst"
+WS_TOKEN_SALT = "accounts.ws_auth"
+WS_PROFILE_KEY = "ws_profile:user:{uid}"
+WS_REVOKED_KEY = "ws_revoked:user:{uid}"      # 이 시각 이전에 발급된 토큰은 무효(토큰 수명만큼 보관)
+
+_ROOM_PATH = re.compile(r"^/ws/rooms/(?P<slug>[^/]+)/$")    # collab/routing.py 방 WS 경로
+
+
+def _profile_of(user) -> dict:
+    return {"id": user.pk, "username": user.get_username(), "is_active": user.is_active,
+            "session_hash": user.get_session_auth_hash()}
+
+
+def cache_profile(user) -> None:
+    cache.set(WS_PROFILE_KEY.format(uid=user.pk), _profile_of(user), settings.WS_PROFILE_TTL)
+
+
+def forget_profile(user_id: int) -> None:
+    cache.delete(WS_PROFILE_KEY.format(uid=user_id))
+
+
+def revoke_tokens(user_id: int) -> None:
+    """지금까지 발급된 이 사용자의 WS 토큰 전부 무효화(로그아웃/강제 로그아웃)."""
+    cache.set(WS_REVOKED_KEY.format(uid=user_id), time.time(), settings.WS_TOKEN_MAX_AGE)
+
+
+def issue_ws_token(user, slug: str) -> str:
+    """방 페이지용 WS 접속 토큰(발급하면서 프로필도 캐시에 미리 올려둠)."""
+    cache_profile(user)
+    return signing.dumps(
+        {"u": user.pk, "r": slug, "t": time.time(), "h": user.get_session_auth_hash()},
+        salt=WS_TOKEN_SALT,
+    )
+
+
+def _user_from_profile(profile: dict):
+    User = get_user_model()
+    user = User(pk=profile["id"], is_active=profile["is_active"])
+    setattr(user, User.USERNAME_FIELD, profile["username"])
+    return user
+
+
+async def _load_profile(uid: int):
+    """(프로필 | None, 토큰 무효화 시각 | None) — 캐시 왕복 1번(미스면 DB 1번)."""
+    key, revoked_key = WS_PROFILE_KEY.format(uid=uid), WS_REVOKED_KEY.format(uid=uid)
+    hit = await cache.aget_many([key, revoked_key])
+    profile, revoked_at = hit.get(key), hit.get(revoked_key)
+    if profile is None:
+        User = get_user_model()
+        row = await (User.objects.filter(pk=uid)
+                     .values("id", User.USERNAME_FIELD, "is_active", "password").afirst())
+        if row is None:
+            return None, revoked_at
+        profile = {
+            "id": row["id"], "username": row[User.USERNAME_FIELD], "is_active": row["is_active"],
+            "session_hash": User(password=row["password"]).get_session_auth_hash(),
+        }
+        await cache.aset(key, profile, settings.WS_PROFILE_TTL)
+    return profile, revoked_at
+
+
+def _token_slug(path: str) -> Optional[str]:
+    m = _ROOM_PATH.match(path or "")
+    return m.group("slug") if m else None
+
+
+async def user_from_token(token: str, path: str):
+    """유효한 토큰(이 방 경로용, 무효화 이후 발급, 세션 해시 일치)이면 User(DB 미조회 인스턴스), 아니면 None."""
+    try:
+        data = signing.loads(token, salt=WS_TOKEN_SALT, max_age=settings.WS_TOKEN_MAX_AGE)
+    except signing.BadSignature:       # SignatureExpired 포함
+        return None
+    if not data.get("r") or data.get("r") != _token_slug(path):
+        return None
+    profile, revoked_at = await _load_profile(data.get("u"))
+    if not profile or not profile["is_active"]:
+        return None
+    if revoked_at is not None and data.get("t", 0) <= revoked_at:
+        return None
+    if data.get("h") != profile.get("session_hash"):
+        return None
+    return _user_from_profile(profile)
+
+
+class WsTokenAuthMiddleware:
+    """?wst= 토큰이 유효하면 세션 없이 통과, 아니면 AuthMiddlewareStack으로 위임."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.fallback = AuthMiddlewareStack(inner)
+
+    async def __call__(self, scope, receive, send):
+        params = parse_qs(scope.get("query_string", b"").decode("utf-8", "ignore"))
+        token = (params.get(WS_TOKEN_PARAM) or [None])[0]
+        user = await user_from_token(token, scope.get("path", "")) if token else None
+        if user is None:
+            return await self.fallback(scope, receive, send)
+        return await self.inner(dict(scope, user=user), receive, send)
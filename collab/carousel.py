@@ -0,0 +1,69 @@
+# collab/carousel.py
+"""
+방별 캐러셀(현재 슬라이드) 상태 — 권위 있는 값은 서버(Redis 캐시 DB)에.
+- room_carousel:<room_id> 해시 = {image_id, idx, version}
+- image.goto는 비교 후 설정(CAS): 클라가 본 version과 같을 때만 반영하고 version+1
+  → 늦게 도착한/오래된 이동 요청은 거절되고, 요청자에게만 현재 상태를 돌려줌(슬라이드 떨림 없음)
+- 입장 bootstrap이 이 값을 읽으므로 새로 들어온 클라가 자기 위치를 방 전체에 방송할 필요 없음
+여러 ASGI 프로세스가 같은 방을 나눠 받아도 Redis 한 곳에서 원자적으로 판정(Lua 1번 왕복).
+클라이언트는 이벤트 루프마다 따로(accounts/presence.py와 같은 이유).
+"""
+import asyncio
+import weakref
+from typing import Optional, Tuple
+
+import redis.asyncio as aioredis
+from django.conf import settings
+
+CAROUSEL_KEY = "room_carousel:{room_id}"
+CAROUSEL_TTL = 60 * 60 * 24 * 7     # 마지막 이동 후 보관 기간(방이 사라지면 자연 만료)
+
+# KEYS[1]=key, ARGV: expected_version, image_id, idx, ttl
+# 반환: {applied(0/1), image_id, idx, version}
+_CAS_LUA = """
+local cur = tonumber(redis.call('hget', KEYS[1], 'version') or '0')
+if tonumber(ARGV[1]) ~= cur then
+    local s = redis.call('hmget', KEYS[1], 'image_id', 'idx')
+    return {0, s[1] or '', s[2] or '', cur}
+end
+local nxt = cur + 1
+redis.call('hset', KEYS[1], 'image_id', ARGV[2], 'idx', ARGV[3], 'version', nxt)
+redis.call('expire', KEYS[1], tonumber(ARGV[4]))
+return {1, ARGV[2], ARGV[3], nxt}
+"""
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def _redis() -> aioredis.Redis:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = aioredis.from_url(settings.CACHES["default"]["LOCATION"], decode_responses=True)
+    return client
+
+
+def _state(image_id, idx, version) -> dict:
+    return {
+        "image_id": image_id or None,
+        "idx": int(idx) if idx not in (None, "") else None,
+        "version": int(version or 0),
+    }
+
+
+async def get_state(room_id: int) -> Optional[dict]:
+    """저장된 캐러셀 상태(아직 아무도 이동 안 했으면 None)."""
+    raw = await _redis().hgetall(CAROUSEL_KEY.format(room_id=room_id))
+    if not raw:
+        return None
+    return _state(raw.get("image_id"), raw.get("idx"), raw.get("version"))
+
+
+async def compare_and_set(room_id: int, expected_version: int, image_id: Optional[str],
+                          idx: Optional[int]) -> Tuple[bool, dict]:
+    """expected_version이 현재 version과 같을 때만 이동 반영. 반환: (반영 여부, 반영 후/현재 상태)."""
+    applied, cur_image, cur_idx, version = await _redis().eval(
+        _CAS_LUA, 1, CAROUSEL_KEY.format(room_id=room_id),
+        int(expected_version or 0), image_id or "", "" if idx is None else int(idx), CAROUSEL_TTL,
+    )
+    return bool(applied), _state(cur_image, cur_idx, version)
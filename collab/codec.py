@@ -0,0 +1,242 @@
+# collab/codec.py
+"""
+JSON 코덱 교체 지점(WS 컨슈머 + JSON API 뷰 공용).
+- orjson → msgspec → 표준 json 순서로 설치된 것을 사용(없어도 동작)
+- msgspec이 있으면 클라이언트 → 서버 WS 메시지(chat/draw/image.*)를 타입 구조체로 디코딩 = 파싱하면서 검증
+- 문자열은 ensure_ascii=False + 공백 없는 구분자(한글이 \\uXXXX로 6배 늘지 않음)
+- 방 WS는 `msgpack` 서브프로토콜도 지원: 바이너리 프레임 + 스트로크 좌표는 float32 배열(pts)로 압축
+"""
+import json
+import logging
+import struct
+from typing import Optional, Union
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:       # 선택 의존성
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:       # 선택 의존성
+    msgspec = None
+
+try:
+    import msgpack        # channels_redis 의존성이라 보통 설치되어 있음
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger("collab")
+
+_django_default = DjangoJSONEncoder().default      # datetime/Decimal/UUID/lazy 문자열 처리
+
+
+class DecodeError(ValueError):
+    """클라이언트 프레임이 JSON이 아니거나 스키마에 맞지 않음."""
+
+
+# ──────────────────────────────────────────────────────────────
+# 인코딩
+# ──────────────────────────────────────────────────────────────
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj, default=_django_default, option=orjson.OPT_NON_STR_KEYS)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _encoder = msgspec.json.Encoder(enc_hook=_django_default)
+
+    def dumps_bytes(obj) -> bytes:
+        return _encoder.encode(obj)
+
+else:
+    BACKEND = "json"
+
+    def dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps(obj) -> str:
+    return dumps_bytes(obj).decode()
+
+
+# ──────────────────────────────────────────────────────────────
+# 디코딩 (+ msgspec 스키마)
+# ──────────────────────────────────────────────────────────────
+def loads(data: Union[str, bytes]):
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        if msgspec is not None:
+            return msgspec.json.decode(data)
+        return json.loads(data)
+    except ValueError as e:            # orjson/msgspec 오류도 ValueError 하위
+        raise DecodeError(str(e)) from e
+
+
+if msgspec is not None:
+    Id = Union[int, str, None]
+
+    class _Action(msgspec.Struct, tag_field="action", omit_defaults=True):
+        pass
+
+    class Chat(_Action, tag="chat"):
+        message: str = ""
+
+    class ImageGoto(_Action, tag="image.goto"):
+        idx: Optional[int] = None
+        image_id: Id = None
+        version: Optional[int] = None     # 클라가 마지막으로 본 캐러셀 version(비교 후 설정)
+
+    class DrawStroke(_Action, tag="draw.stroke"):
+        image_id: Id = None
+        path_id: Id = None
+        color: Optional[str] = None
+        size: Union[int, float, None] = None
+        mode: Optional[str] = None
+        points: list[dict[str, float]] = []
+        first: bool = False
+        last: bool = False
+
+    class DrawClear(_Action, tag="draw.clear"):
+        image_id: Id = None
+
+    class DrawSnapshotRequest(_Action, tag="draw.request_snapshot"):
+        image_id: Id = None
+
+    class ImagePropose(_Action, tag="image.propose"):
+        pending_id: Id = None
+        name: Optional[str] = None
+        size: Optional[int] = None
+        type: Optional[str] = None
+
+    class ImageApproved(_Action, tag="image.approved"):
+        pending_id: Id = None
+        uploader_id: Id = None
+
+    class ImageRejected(_Action, tag="image.rejected"):
+        pending_id: Id = None
+        uploader_id: Id = None
+
+    class Leave(_Action, tag="leave"):
+        pass
+
+    ClientMessage = Union[Chat, ImageGoto, DrawStroke, DrawClear, DrawSnapshotRequest,
+                          ImagePropose, ImageApproved, ImageRejected, Leave]
+    _room_decoder = msgspec.json.Decoder(ClientMessage)
+
+    def decode_room_message(data: Union[str, bytes]) -> dict:
+        """방 WS 메시지 → dict(검증 통과분만). 필드 타입이 틀리거나 모르는 action이면 DecodeError."""
+        try:
+            msg = _room_decoder.decode(data)
+        except (msgspec.ValidationError, msgspec.DecodeError) as e:
+            raise DecodeError(str(e)) from e
+        out = msgspec.structs.asdict(msg)
+        out["action"] = msg.__struct_config__.tag
+        return out
+
+else:
+    def decode_room_message(data: Union[str, bytes]) -> dict:
+        obj = loads(data)
+        if not isinstance(obj, dict):
+            raise DecodeError("expected a JSON object")
+        return obj
+
+
+# ──────────────────────────────────────────────────────────────
+# MessagePack 서브프로토콜 (방 WS)
+# 좌표 리스트 [{"x":..,"y":..}, ...] ↔ "pts": float32 리틀엔디언 [x0,y0,x1,y1,...] (점당 8바이트)
+# ──────────────────────────────────────────────────────────────
+MSGPACK_SUBPROTOCOL = "msgpack"
+MSGPACK_AVAILABLE = msgpack is not None
+
+
+def _points_to_bin(points) -> bytes:
+    flat = []
+    for p in points:
+        flat.append(float(p.get("x", 0)))
+        flat.append(float(p.get("y", 0)))
+    return struct.pack(f"<{len(flat)}f", *flat)
+
+
+def _bin_to_points(raw: bytes) -> list:
+    if len(raw) % 8:
+        raise DecodeError("pts length must be a multiple of 8")
+    flat = struct.unpack(f"<{len(raw) // 4}f", raw)
+    return [{"x": flat[i], "y": flat[i + 1]} for i in range(0, len(flat), 2)]
+
+
+def _compact_points(obj: dict) -> dict:
+    """draw.stroke / draw.snapshot 의 points를 pts(float32 바이너리)로 바꾼 얕은 복사본."""
+    action = obj.get("action")
+    if action == "draw.stroke" and isinstance(obj.get("points"), list):
+        out = {k: v for k, v in obj.items() if k != "points"}
+        out["pts"] = _points_to_bin(obj["points"])
+        return out
+    if action == "draw.snapshot" and isinstance(obj.get("strokes"), list):
+        out = dict(obj)
+        out["strokes"] = [
+            {**{k: v for k, v in st.items() if k != "points"}, "pts": _points_to_bin(st.get("points") or [])}
+            for st in obj["strokes"]
+        ]
+        return out
+    return obj
+
+
+def pack(obj) -> bytes:
+    """서버 → 클라 msgpack 프레임."""
+    if isinstance(obj, dict):
+        obj = _compact_points(obj)
+    return msgpack.packb(obj, use_bin_type=True, default=_django_default)
+
+
+def unpack_room_message(data: bytes) -> dict:
+    """클라 → 서버 msgpack 프레임 → dict(좌표 복원 + msgspec 있으면 스키마 검증)."""
+    try:
+        obj = msgpack.unpackb(data, raw=False)
+    except Exception as e:
+        raise DecodeError(str(e)) from e
+    if not isinstance(obj, dict):
+        raise DecodeError("expected a map")
+    pts = obj.pop("pts", None)
+    if isinstance(pts, (bytes, bytearray)):
+        obj["points"] = _bin_to_points(bytes(pts))
+    if msgspec is None:
+        return obj
+    try:
+        msg = msgspec.convert(obj, ClientMessage)
+    except msgspec.ValidationError as e:
+        raise DecodeError(str(e)) from e
+    out = msgspec.structs.asdict(msg)
+    out["action"] = msg.__struct_config__.tag
+    return out
+
+
+# ──────────────────────────────────────────────────────────────
+# Django / Channels 연결부
+# ──────────────────────────────────────────────────────────────
+class JsonResponse(HttpResponse):
+    """django.http.JsonResponse 대체(같은 인자), 직렬화만 위 코덱 사용."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps_bytes(data), **kwargs)
+
+
+class CodecJsonMixin:
+    """AsyncJsonWebsocketConsumer의 encode_json/decode_json을 코덱으로 교체."""
+
+    @classmethod
+    async def decode_json(cls, text_data):
+        return loads(text_data)
+
+    @classmethod
+    async def encode_json(cls, content):
+        return dumps(content)
@@ -1,12 +1,13 @@
 import asyncio
-import json
+import itertools
 import logging
 from operator import ne
 import time
 from collections import defaultdict
 from typing import Optional, Dict, List
+from urllib.parse import parse_qs
 
-from asgiref.sync import sync_to_async, async_to_sync
+from asgiref.sync import async_to_sync
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
@@ -15,6 +16,13 @@ from django.db.models import F
 from django.utils import timezone
 
 from .models import Room, RoomMember, Message
+from .occupancy import mark_dirty, occupancy_annotation
+from .search import ROOM_PAGE_SIZE, filter_rooms
+from .lobby import LOBBY_GROUP, lobby_groups, topic_group, parse_topics
+from . import carousel, codec, frames, history, lanes, outbox
+from .dbexec import db_write
+from config.db_router import bind_user, replica_reads
+from .sendqueue import QueueOverflow, SendQueue
 
 logger = logging.getLogger("collab")
 
@@ -30,7 +38,7 @@ EMPTY_ROOM_SILENT = True
 DRAW_STORE: Dict[int, Dict[str, List[dict]]] = defaultdict(lambda: defaultdict(list))
 
 
-class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
+class RoomPresenceConsumer(codec.CodecJsonMixin, AsyncJsonWebsocketConsumer):
     """
     - connect: slug→방 로드, owner id 세팅, 그룹조인, 스냅샷 전송
     - receive_json: chat, draw.stroke/clear/request_snapshot, image.*(propose/approved/rejected/goto)
@@ -44,6 +52,7 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
             logger.info("│   코딩라인 — 실시간 접속 시작                                              │")
             logger.info("└────────────────────────────────────────────────────────────────────────────┘")
         logger.info("[단계] WS 연결 시도 connect()")
+        outbox.ensure_dispatcher()   # 이 프로세스의 아웃박스 디스패처(없으면 시작)
 
         # 1) URL params + 유저
         self.slug = self.scope["url_route"]["kwargs"]["slug"]
@@ -51,6 +60,7 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
         if not self.user.is_authenticated:
             await self.close(code=4001)
             return
+        bind_user(self.user)      # 이 접속의 쓰기 → 잠시 동안 이 사용자 읽기는 primary
 
         # 2) 방
         room = await self._get_room(self.slug)
@@ -62,29 +72,45 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
         self.was_owner = (self.user.id == self.owner_id)   #
 
         # 3) 입장 정책/카운트
-        ok, reason = await self._inc_conn(room.id, self.user.id)
+        ok, reason = await self._inc_conn(room.id, self.user)
         if not ok:
             logger.info("입장 거절: %s", reason)
             await self.close(code=4403)
             return
+        mark_dirty(room.id)  # 로비 인원 갱신 예약(1초 단위로 묶어서 전송)
 
         # 4) 그룹
         self.group = f"room_{room.pk}"
         self.user_group = f"room_{room.pk}_user_{self.user.pk}"
         await self.channel_layer.group_add(self.group, self.channel_name)
         await self.channel_layer.group_add(self.user_group, self.channel_name)
-
-        # 5) 수락
-        await self.accept()
+        self.chat_group = lanes.lane_group(room.pk, lanes.CHAT)
+        self.draw_group = lanes.lane_group(room.pk, lanes.DRAW)
+        await self._join_lanes(room.pk)
+
+        # 5) 수락 (클라가 msgpack 서브프로토콜을 요청했고 서버에 msgpack이 있으면 바이너리 프레임)
+        self.binary = (codec.MSGPACK_AVAILABLE
+                       and codec.MSGPACK_SUBPROTOCOL in (self.scope.get("subprotocols") or []))
+        await self.accept(subprotocol=codec.MSGPACK_SUBPROTOCOL if self.binary else None)
+        self.outq = SendQueue(self._write_frame, self._send_resync)   # 이후 모든 송신은 접속별 큐 경유
         self.left_explicitly = False
         logger.info("[단계] 입장 accept() room=%s user=%s", self.room.id, self.user.id)
 
-        # 6) 현재 접속자 스냅샷(본인에게만)
-        members = await self._active_users(self.room.id)
+        # 6) 입장 bootstrap(본인에게만): 접속자 + 최신 메시지 페이지 + 현재 슬라이드 + 그 이미지 드로잉
+        #    따로 하던 HTTP 히스토리 / draw.request_snapshot / image.goto 왕복을 프레임 1개로, 조회는 동시에
+        members, history_page, slide = await asyncio.gather(
+            self._active_users(self.room.id),
+            self._recent_messages(self.room.id),
+            self._carousel_state(self.room.id),
+        )
+        image_id = slide.get("image_id")
         await self.send_json({
-            "event": "presence_snapshot",
+            "event": "bootstrap",
             "version": int(time.time() * 1000),
             "members": members,
+            "messages": history_page,
+            "carousel": slide,
+            "drawing": {"image_id": image_id, "strokes": DRAW_STORE[self.room.id][image_id]} if image_id else None,
         })
 
     # collab/consumers.py
@@ -106,39 +132,106 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
         if user_group:
             await self.channel_layer.group_discard(user_group, self.channel_name)
         self.user_group = None
+        await self._leave_lanes()
+        outq = getattr(self, "outq", None)
+        if outq:
+            outq.stop()
+            self.outq = None
 
         logger.debug("WS disconnect code=%s", code)
 
+    # ─────────────── 우선순위 레인(chat/draw) ───────────────
+    async def _join_lanes(self, room_id: int):
+        """chat/draw 레인 그룹에 기본 채널을 넣고, 우선순위 전송 태스크 시작(보조 채널/reader 없음)."""
+        self._lane_queue = asyncio.PriorityQueue()
+        self._lane_seq = itertools.count()
+        self._lane_resync = False
+        self.lane_dropped = 0
+        for lane in lanes.LANES:
+            await self.channel_layer.group_add(lanes.lane_group(room_id, lane), self.channel_name)
+        self._lane_task = asyncio.create_task(self._lane_sender())
+
+    async def _leave_lanes(self):
+        task = getattr(self, "_lane_task", None)
+        if task:
+            task.cancel()
+        self._lane_task = None
+        room = getattr(self, "room", None)
+        if room is not None:
+            for lane in lanes.LANES:
+                await self.channel_layer.group_discard(lanes.lane_group(room.pk, lane), self.channel_name)
+
+    async def lane_chat(self, event):
+        self._lane_enqueue(event)
+
+    async def lane_draw(self, event):
+        self._lane_enqueue(event)
+
+    def _lane_enqueue(self, event):
+        # 여기서는 큐에 넣기만 → 기본 채널의 다음 메시지(control)가 곧바로 처리됨
+        queue = getattr(self, "_lane_queue", None)
+        if queue is not None:
+            queue.put_nowait((lanes.LANES[event["lane"]]["priority"], next(self._lane_seq), event))
+
+    async def _lane_sender(self):
+        # chat → draw 순으로 비움
+        while True:
+            _, _, envelope = await self._lane_queue.get()
+            if lanes.is_expired(envelope):
+                self.lane_dropped += 1            # 오래 묵은 붓질은 버리고 스냅샷으로 복구
+                self._lane_resync = True
+            else:
+                message = envelope["message"]
+                try:
+                    await self.dispatch(message)
+                except Exception:
+                    logger.exception("lane dispatch failed lane=%s type=%s", envelope["lane"], message.get("type"))
+            if self._lane_resync and self._lane_queue.empty():
+                self._lane_resync = False
+                await self._send_resync()
 
 
-    # ─────────────── DB helpers ───────────────
-    @sync_to_async
-    def _get_room(self, slug):
-        try:
-            return Room.objects.get(slug=slug)
-        except Room.DoesNotExist:
-            return None
 
-    @sync_to_async
-    def _active_users(self, room_id: int):
-        room = Room.objects.only("id", "created_by_id").get(pk=room_id)
-        qs = (RoomMember.objects
-              .filter(room_id=room_id, is_banned=False, open_conn__gt=0)
-              .select_related("user")
-              .values("user_id", "user__username"))
-        return [
-            {
-                "user_id": x["user_id"],
-                "username": x["user__username"],
-                "is_owner": (x["user_id"] == room.created_by_id),
-            }
-            for x in qs
-        ]
-
-    @sync_to_async
-    def _inc_conn(self, room_id: int, user_id: int):
-        User = get_user_model()
-        user = User.objects.get(pk=user_id)
+    # ─────────────── DB helpers ───────────────
+    # 읽기: async ORM / 쓰기(트랜잭션): db_write 전용 풀 (collab/dbexec.py)
+    async def _get_room(self, slug):
+        return await Room.objects.filter(slug=slug).afirst()
+
+    async def _active_users(self, room_id: int):
+        with replica_reads():
+            room = await Room.objects.only("id", "created_by_id").aget(pk=room_id)
+            qs = (RoomMember.objects
+                  .filter(room_id=room_id, is_banned=False, open_conn__gt=0)
+                  .values("user_id", "user__username"))
+            return [
+                {
+                    "user_id": x["user_id"],
+                    "username": x["user__username"],
+                    "is_owner": (x["user_id"] == room.created_by_id),
+                }
+                async for x in qs
+            ]
+
+    async def _recent_messages(self, room_id: int):
+        with replica_reads():
+            return await history.amessage_page(room_id)
+
+    async def _carousel_state(self, room_id: int):
+        state = await carousel.get_state(room_id)
+        if state is not None:
+            return state
+        # 아직 아무도 넘기지 않은 방: 클라이언트 기본 동작과 같게 가장 최근 이미지(version 0)
+        with replica_reads():
+            newest = await (Message.objects
+                            .filter(room_id=room_id)
+                            .exclude(image="")
+                            .values_list("id", flat=True)
+                            .afirst())
+        return {"image_id": str(newest) if newest else None, "idx": None, "version": 0}
+
+    @db_write
+    def _inc_conn(self, room_id: int, user):
+        # user: scope의 User(토큰 인증이면 DB 미조회 인스턴스) → 다시 조회하지 않음
         room = Room.objects.get(pk=room_id)
 
         ok, reason = room.can_enter(user)
@@ -161,20 +254,19 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                 if was_inactive:
                     async_to_sync(self.channel_layer.group_send)(
                         f"room_{room.id}",
-                        {"type": "room.event",
-                         "payload": {
-                             "event": "user_joined",
-                             "room_id": room.id,
-                             "user_id": user.id,
-                             "username": getattr(user, "username", "user"),
-                             "is_owner": is_owner,
-                             "version": int(time.time() * 1000),
-                         }}
+                        frames.room_event({
+                            "event": "user_joined",
+                            "room_id": room.id,
+                            "user_id": user.id,
+                            "username": getattr(user, "username", "user"),
+                            "is_owner": is_owner,
+                            "version": int(time.time() * 1000),
+                        })
                     )
             transaction.on_commit(_broadcast_join)
         return True, None
 
-    @sync_to_async
+    @db_write
     def _dec_open_conn_only(self, room_id: int, user_id: int):
         try:
             with transaction.atomic():
@@ -188,12 +280,14 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
         except Room.DoesNotExist:
             return
 
+    @db_write
     def _finalize_leave_immediately(self, room_id: int, user_id: int):
         try:
             owner_changed_payload = None
             with transaction.atomic():
                 room = Room.objects.select_for_update().get(pk=room_id)
                 room_slug = room.slug
+                room_topic = room.topic
                 User = get_user_model()
                 user = User.objects.get(pk=user_id)
                 mem = RoomMember.objects.select_for_update().filter(room=room, user=user).first()
@@ -231,11 +325,11 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                             f"room_{room_id}",
                             {"type": "room.closed", "msg": "방이 삭제되었습니다.", "slug": room_slug}
                         )
-                        async_to_sync(self.channel_layer.group_send)(
-                            "lobby",
-                            {"type": "lobby.event",
-                             "payload": {"event": "room_closed", "room_id": room_id, "slug": room_slug}}
-                        )
+                        for lobby_group in lobby_groups(room_topic):
+                            async_to_sync(self.channel_layer.group_send)(
+                                lobby_group,
+                                frames.lobby_event({"event": "room_closed", "room_id": room_id, "slug": room_slug})
+                            )
                     transaction.on_commit(_broadcast_room_closed)
 
                 def _broadcast():
@@ -243,22 +337,23 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                     if owner_changed_payload:
                         owner_changed_payload["version"] = ver
                         async_to_sync(self.channel_layer.group_send)(
-                            f"room_{room.id}", {"type": "room.event", "payload": owner_changed_payload}
+                            f"room_{room.id}", frames.room_event(owner_changed_payload)
                         )
                     async_to_sync(self.channel_layer.group_send)(
                         f"room_{room_id}",
-                        {"type": "room.event", "payload": {
+                        frames.room_event({
                             "event": "user_left",
                             "room_id": room_id,
                             "user_id": user_id,
                             "username": getattr(user, "username", "user"),
                             "version": ver,
-                        }}
+                        })
                     )
                 transaction.on_commit(_broadcast)
         except Room.DoesNotExist:
             return
 
+    @db_write
     def _finalize_leave_if_still_gone(self, room_id: int, user_id: int):
         try:
             owner_changed_payload = None
@@ -266,6 +361,7 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
             with transaction.atomic():
                 room = Room.objects.select_for_update().get(pk=room_id)
                 room_slug = room.slug
+                room_topic = room.topic
                 User = get_user_model()
                 user = User.objects.get(pk=user_id)
                 mem = RoomMember.objects.select_for_update().filter(room=room, user=user).first()
@@ -311,11 +407,11 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                             f"room_{room_id}",
                             {"type": "room.closed", "msg": "방이 삭제되었습니다.", "slug": room_slug}
                         )
-                        async_to_sync(self.channel_layer.group_send)(
-                            "lobby",
-                            {"type": "lobby.event",
-                             "payload": {"event": "room_closed", "room_id": room_id, "slug": room_slug}}
-                        )
+                        for lobby_group in lobby_groups(room_topic):
+                            async_to_sync(self.channel_layer.group_send)(
+                                lobby_group,
+                                frames.lobby_event({"event": "room_closed", "room_id": room_id, "slug": room_slug})
+                            )
                     transaction.on_commit(_broadcast_room_closed)
 
                 def _broadcast_after_commit():
@@ -323,29 +419,41 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                     if owner_changed_payload:
                         owner_changed_payload["version"] = ver
                         async_to_sync(self.channel_layer.group_send)(
-                            f"room_{room.id}", {"type": "room.event", "payload": owner_changed_payload}
+                            f"room_{room.id}", frames.room_event(owner_changed_payload)
                         )
                     if user_left_payload:
                         user_left_payload["version"] = ver
                         async_to_sync(self.channel_layer.group_send)(
-                            f"room_{room_id}", {"type": "room.event", "payload": user_left_payload}
+                            f"room_{room_id}", frames.room_event(user_left_payload)
                         )
                 transaction.on_commit(_broadcast_after_commit)
         except Room.DoesNotExist:
             return
 
-    @sync_to_async
+    @db_write
     def _save_text_message(self, room_id: int, user_id: int, message: str) -> Optional[int]:
         try:
-            room = Room.objects.get(pk=room_id)
-            user = get_user_model().objects.get(pk=user_id)
-            m = Message.objects.create(room=room, user=user, content=message)
+            # FK는 id로 바로 INSERT (Room/User 재조회 없음)
+            m = Message.objects.create(room_id=room_id, user_id=user_id, content=message)
             return m.pk
         except Exception as e:
             logger.exception("save_text_message failed: %s", e)
             return None
 
     # ─────────────── 클라 → 서버 ───────────────
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        try:
+            if bytes_data is not None and getattr(self, "binary", False):
+                content = codec.unpack_room_message(bytes_data)
+            elif text_data is not None:
+                content = codec.decode_room_message(text_data)   # msgspec 있으면 스키마 검증까지
+            else:
+                return
+        except codec.DecodeError as e:
+            logger.debug("잘못된 WS 메시지 무시 room=%s err=%s", getattr(self, "slug", None), e)
+            return
+        await self.receive_json(content)
+
     async def receive_json(self, content, **kwargs):
         action = content.get("action")
         if not action:
@@ -360,24 +468,30 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                 return
             msg_id = await self._save_text_message(self.room.id, self.user.id, text)
             await self.channel_layer.group_send(
-                self.group,
-                {"type": "chat.message",
-                 "message": text,
-                 "sender": getattr(self.user, "username", "user"),
-                 "message_id": msg_id,
-                 "ts": timezone.now().isoformat()}
+                self.chat_group,
+                lanes.wrap(frames.chat_message(
+                    message=text,
+                    sender=getattr(self.user, "username", "user"),
+                    message_id=msg_id,
+                    ts=timezone.now().isoformat(),
+                ), lanes.CHAT)
             )
             return
 
-        # 2) 이미지 인덱스 동기화
+        # 2) 이미지 인덱스 동기화: 방 캐러셀 상태에 비교 후 설정(CAS)
         if action == "image.goto":
-            payload = {
-                "action": "image.goto",
-                "idx": content.get("idx"),
-                "image_id": content.get("image_id"),
-                "ts": timezone.now().isoformat(),
-            }
-            await self.channel_layer.group_send(self.group, {"type": "room.event", "payload": payload})
+            image_id = content.get("image_id")
+            applied, state = await carousel.compare_and_set(
+                self.room.id, content.get("version") or 0,
+                str(image_id) if image_id is not None else None, content.get("idx"),
+            )
+            payload = {"action": "image.goto", **state, "ts": timezone.now().isoformat()}
+            if applied:
+                # 권위 있는 상태 변경 → control 그룹(만료/버림 없음)
+                await self.channel_layer.group_send(self.group, frames.room_event(payload))
+            else:
+                # 그 사이 누가 먼저 넘김 → 요청자만 현재 슬라이드로 맞춤(방 전체 방송 없음)
+                await self.send_json({**payload, "rejected": True})
             return
 
         # 3) 드로잉
@@ -402,15 +516,14 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
 
             # [브로드캐스트] 같은 프레임에서 받은 포인트만 뿌림
             await self.channel_layer.group_send(
-                self.group,
-                {"type": "room.event",
-                 "payload": {
-                     "action": "draw.stroke",
-                     "image_id": image_id,
-                     "color": color, "size": size, "mode": mode,
-                     "points": points,
-                     "ts": timezone.now().isoformat(),
-                 }}
+                self.draw_group,
+                lanes.wrap(frames.room_event({
+                    "action": "draw.stroke",
+                    "image_id": image_id,
+                    "color": color, "size": size, "mode": mode,
+                    "points": points,
+                    "ts": timezone.now().isoformat(),
+                }), lanes.DRAW)
             )
             return
 
@@ -420,9 +533,8 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                 return
             DRAW_STORE[self.room.id][image_id] = []  # 전체 비움
             await self.channel_layer.group_send(
-                self.group,
-                {"type": "room.event",
-                 "payload": {"action": "draw.clear", "image_id": image_id, "ts": timezone.now().isoformat()}}
+                self.draw_group,
+                lanes.wrap(frames.room_event({"action": "draw.clear", "image_id": image_id, "ts": timezone.now().isoformat()}), lanes.DRAW)
             )
             return
 
@@ -452,15 +564,14 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
             owner_group = f"room_{self.room.id}_user_{self.owner_id}"
             await self.channel_layer.group_send(
                 owner_group,
-                {"type": "room.event",
-                 "payload": {
-                     "action": "image.propose",
-                     "pending_id": pending_id,
-                     "uploader_id": self.user.id,
-                     "uploader_name": getattr(self.user, "username", "user"),
-                     "name": name, "size": size, "type": typ,
-                     "ts": timezone.now().isoformat(),
-                 }}
+                frames.room_event({
+                    "action": "image.propose",
+                    "pending_id": pending_id,
+                    "uploader_id": self.user.id,
+                    "uploader_name": getattr(self.user, "username", "user"),
+                    "name": name, "size": size, "type": typ,
+                    "ts": timezone.now().isoformat(),
+                })
             )
             return
 
@@ -474,7 +585,7 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                 "uploader_id": content.get("uploader_id"),
                 "ts": timezone.now().isoformat(),
             }
-            await self.channel_layer.group_send(self.group, {"type": "room.event", "payload": payload})
+            await self.channel_layer.group_send(self.group, frames.room_event(payload))
             return
 
         # 5) 명시적 퇴장
@@ -487,17 +598,65 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
                 await self.channel_layer.group_discard(group, self.channel_name)
             if user_group:
                 await self.channel_layer.group_discard(user_group, self.channel_name)
+            await self._leave_lanes()
 
             # 필요하다면 이후 disconnect에서 중복으로 호출되지 않도록 정리
             self.group = None
             self.user_group = None
 
-            await sync_to_async(self._finalize_leave_immediately)(self.room.id, self.user.id)
+            await self._finalize_leave_immediately(self.room.id, self.user.id)
+            mark_dirty(self.room.id)
             await self.close(code=4000)
             return
 
+    # ─────────────── 송신 큐 ───────────────
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        if close or not getattr(self, "outq", None):
+            await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+            return
+        await self.send_frame(text_data=text_data, bytes_data=bytes_data)
+
+    async def send_frame(self, *, text_data=None, bytes_data=None, kind=None):
+        """kind(draw.stroke/image.goto/chat/…)를 알고 큐에 넣음 → 밀리면 버려도 되는 것부터 정리."""
+        if not getattr(self, "outq", None):
+            await super().send(text_data=text_data, bytes_data=bytes_data)
+            return
+        try:
+            self.outq.put(text_data, bytes_data, kind)
+        except QueueOverflow as e:
+            logger.warning("느린 클라이언트 연결 종료 room=%s user=%s (%s)", self.room.id, self.user.id, e)
+            self.outq.stop()
+            self.outq = None
+            await self.close(code=4008)
+
+    async def _write_frame(self, text_data, bytes_data):
+        await super().send(text_data=text_data, bytes_data=bytes_data)
+
+    async def _send_resync(self):
+        # 붓질 프레임을 버렸음 → 클라가 현재 이미지 드로잉 스냅샷을 다시 요청하도록
+        content = {"event": "resync", "scope": "draw"}
+        if self.binary:
+            await self._write_frame(None, codec.pack(content))
+        else:
+            await self._write_frame(codec.dumps(content), None)
+
+    async def close(self, code=None, *args, **kwargs):
+        outq = getattr(self, "outq", None)
+        if outq:
+            await outq.drain(control_only=True)     # 강퇴/방 삭제 안내가 close보다 먼저(밀린 붓질은 안 기다림)
+        await super().close(code, *args, **kwargs)
+
     # ─────────────── 서버 → 클라 헬퍼 ───────────────
+    async def send_json(self, content, close=False):
+        if getattr(self, "binary", False):
+            await self.send(bytes_data=codec.pack(content), close=close)
+        else:
+            await super().send_json(content, close=close)
+
     async def chat_message(self, event):
+        if "frame" in event:                     # 보낸 쪽에서 한 번 인코딩한 프레임 → 그대로 전달
+            await frames.send_event(self, event)
+            return
         await self.send_json({
             "event": "chat",
             "user": event.get("sender", "server"),
@@ -517,16 +676,34 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
             "ts": event.get("ts") or timezone.now().isoformat(),
         })
 
+    async def image_batch(self, event):
+        """다중 업로드를 한 번에 받은 경우(업로드 API가 group_send(type="image.batch"))"""
+        await self.send_json({
+            "event": "image.batch",
+            "user": event.get("user", "server"),
+            "items": event.get("items") or [],
+        })
+
+    async def image_ready(self, event):
+        """이미지 후처리(리사이즈 변형본) 완료 → 작은 이미지로 교체하라고 알림"""
+        await self.send_json({
+            "event": "image.ready",
+            "message_id": event.get("message_id"),
+            "width": event.get("width"),
+            "height": event.get("height"),
+            "variants": event.get("variants") or {},
+        })
+
     async def room_event(self, event):
-        """브리지: payload를 그대로 클라이언트로"""
-        payload = event["payload"]
+        """브리지: 미리 인코딩된 frame(없으면 payload)을 그대로 클라이언트로"""
+        payload = event.get("payload")
 
         if isinstance(payload, dict) and payload.get("event") == "owner_changed":
             new_owner_id = payload.get("new_owner_id")
             if new_owner_id:
                 self.owner_id = new_owner_id
                 self.was_owner = (self.user.id == new_owner_id)
-        await self.send_json(payload)
+        await frames.send_event(self, event, payload)
 
     async def kicked(self, event):
         await self.send_json({"event": "kicked", "msg": event.get("msg", "강퇴되었습니다.")})
@@ -543,52 +720,111 @@ class RoomPresenceConsumer(AsyncJsonWebsocketConsumer):
     # ─────────────── 유예 정리 ───────────────
     async def _delayed_cleanup(self, room_id: int, user_id: int,delay: float=GRACE_SECONDS):
         await self._dec_open_conn_only(room_id, user_id)
+        mark_dirty(room_id)
         if delay>0:
             await asyncio.sleep(GRACE_SECONDS)
-        await sync_to_async(self._finalize_leave_if_still_gone)(room_id, user_id)
+        await self._finalize_leave_if_still_gone(room_id, user_id)
+        mark_dirty(room_id)
+
 
+class LobbyConsumer(codec.CodecJsonMixin, AsyncJsonWebsocketConsumer):
+    """
+    로비 WS. 쿼리스트링으로 구독 필터 지정 가능:
+    - ?topics=django,react  → 전체 `lobby` 대신 주제별 그룹(lobby_topic_<t>)만 조인
+    - ?free=1               → 빈 자리 있는 방만 (스냅샷 필터 + 꽉 찬 방은 room_hidden,
+                              다시 자리가 난 방은 room_shown(카드 전체)으로 안내)
+    """
 
-class LobbyConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
-        await self.channel_layer.group_add("lobby", self.channel_name)
+        outbox.ensure_dispatcher()
+        params = parse_qs(self.scope.get("query_string", b"").decode("utf-8", "ignore"))
+        self.topics = parse_topics(",".join(params.get("topics", [])))
+        self.only_free = (params.get("free") or ["0"])[0] in ("1", "true")
+        self.groups_joined = [topic_group(t) for t in self.topics] or [LOBBY_GROUP]
+        user = self.scope.get("user")
+        if user is not None and user.is_authenticated:
+            bind_user(user)
+
+        for group in self.groups_joined:
+            await self.channel_layer.group_add(group, self.channel_name)
         await self.accept()
 
         # 방 스냅샷을 접속한 사용자에게만 전송
-        rooms = await sync_to_async(self._room_snapshot)()
-        await self.send(text_data=json.dumps({
+        rooms = await self._room_snapshot()
+        self.listed = {r["id"] for r in rooms}          # 이 클라 목록에 있는 방(room_shown 중복 방지)
+        # 스냅샷이 한 페이지를 꽉 채웠으면 그보다 오래된 방은 목록 밖 → 자리가 나도 끼워 넣지 않음
+        self.listed_floor = min(self.listed) if len(rooms) >= ROOM_PAGE_SIZE else 0
+        await self.send_json({
             "event": "snapshot",
             "rooms": rooms,
-        }))
+        })
         # self.left_explicitly = False
-        logger.info("[단계] 로비 WS 연결 성공")
+        logger.info("[단계] 로비 WS 연결 성공 groups=%s free=%s", self.groups_joined, self.only_free)
 
     async def disconnect(self, code):
-        await self.channel_layer.group_discard("lobby", self.channel_name)
+        for group in getattr(self, "groups_joined", []):
+            await self.channel_layer.group_discard(group, self.channel_name)
         logger.info("[단계] 로비 WS 연결 종료 code=%s", code)
 
     async def lobby_event(self, event):
-        payload = event["payload"]
-        await self.send(text_data=json.dumps(payload))
-        logger.info("[단계] 로비 이벤트 전송 %s", payload)
-
-    def _room_snapshot(self):
+        payload = event.get("payload") or {}
+        # payload는 occupancy에만 실림(frames._LOBBY_INSPECTED) → listed는 스냅샷 + 인원 이벤트로만 관리
+        # (room_created로 생긴 카드는 room_shown이 와도 upsert라 중복 없음)
+        if self.only_free and payload.get("event") == "occupancy":
+            # 빈자리 필터: 꽉 찬 방은 목록에서 빼고, 다시 자리가 난 방은 카드째 다시 넣으라고 알림
+            # occupancy에는 공개 방만 실림(occupancy._existing_rooms) → 비공개 방 때문에 카드 조회가 나가지 않음
+            freed = []
+            for r in payload.get("rooms", []):
+                rid = r.get("room_id")
+                if r.get("occupancy", 0) >= r.get("capacity", 0):
+                    if rid in self.listed:
+                        self.listed.discard(rid)
+                        await self.send(text_data=frames.encode_frame(
+                            {"event": "room_hidden", "room_id": rid, "room_slug": r.get("room_slug")}
+                        ))
+                elif rid is not None and rid not in self.listed and rid > self.listed_floor:
+                    freed.append(rid)
+            if freed:
+                for card in await self._room_cards(freed):
+                    self.listed.add(card["id"])
+                    await self.send(text_data=frames.encode_frame({"event": "room_shown", "room": card}))
+        await frames.send_event(self, event, payload)
+        logger.debug("[단계] 로비 이벤트 전송 %s", event.get("frame") or payload)
+
+    async def _room_snapshot(self):
         """
         로비 접속 직후 내려줄 현재 방 목록.
         필요한 필드만 골라서 dict로 리턴하세요.
         """
         qs = (Room.objects
+              .filter(is_private=False)                     # home 목록과 같게: 비공개 방은 검색으로만
               .select_related("created_by")
-              .order_by("-created_at"))
-
-        return [
-            {
-                "id": room.id,
-                "slug": room.slug,
-                "name": room.Romname,
-                "topic": room.topic,
-                "owner": getattr(room.created_by, "display_name", room.created_by.username),
-                "created_at": room.created_at.isoformat(),
-                "requires_password": bool(room.password),
-            }
-            for room in qs
-        ]
+              .annotate(occupancy=occupancy_annotation()))  # 방별 현재 인원: GROUP BY 1회
+        qs = filter_rooms(qs, topics=self.topics, only_free=self.only_free)
+        qs = qs.order_by("-id")[:ROOM_PAGE_SIZE]            # home 첫 페이지와 같은 개수/순서
+        with replica_reads():                               # 목록 스냅샷은 복제본에서
+            rooms = [room async for room in qs]
+        return [self._room_card(room) for room in rooms]
+
+    async def _room_cards(self, room_ids):
+        """다시 자리가 난 방들의 카드(room_shown용). 방금 바뀐 인원이므로 primary에서 읽음."""
+        qs = (Room.objects
+              .filter(id__in=list(room_ids), is_private=False)
+              .select_related("created_by")
+              .annotate(occupancy=occupancy_annotation()))
+        qs = filter_rooms(qs, topics=self.topics, only_free=True)
+        return [self._room_card(room) async for room in qs.order_by("id")]
+
+    @staticmethod
+    def _room_card(room) -> dict:
+        return {
+            "id": room.id,
+            "slug": room.slug,
+            "name": room.Romname,
+            "topic": room.topic,
+            "owner": getattr(room.created_by, "display_name", room.created_by.username),
+            "created_at": room.created_at.isoformat(),
+            "requires_password": bool(room.password),
+            "occupancy": room.occupancy,
+            "capacity": room.capacity,
+        }
@@ -0,0 +1,37 @@
+# collab/dbexec.py
+"""
+컨슈머 DB 쓰기 전용 실행기.
+- sync_to_async 기본값(thread_sensitive=True)은 프로세스의 모든 WS DB 호출을 스레드 1개로 줄 세움
+- 여기서는 크기가 정해진 전용 스레드 풀(CONSUMER_DB_WORKERS)에서 thread_sensitive=False로 실행
+  → 스레드마다 자기 DB 커넥션(Django 커넥션은 스레드 로컬) → 입장/퇴장/채팅 저장이 동시에 진행
+- 풀 크기 = 이 프로세스가 컨슈머용으로 여는 최대 커넥션 수(MySQL max_connections 예산에 맞출 것)
+읽기는 Django async ORM(aget/afirst/async for)으로, 트랜잭션이 필요한 변경만 db_write로.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=getattr(settings, "CONSUMER_DB_WORKERS", 8),
+    thread_name_prefix="collab-db",
+)
+
+
+def _with_fresh_connection(func):
+    # 요청 사이클 밖이라 request_started/finished 정리가 없음 → 호출 앞뒤로 끊긴/오래된 커넥션 정리
+    @wraps(func)
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return inner
+
+
+def db_write(func):
+    """동기 DB 함수(메서드 포함) → 전용 풀에서 도는 awaitable. sync_to_async와 같은 자리에 쓰면 됨."""
+    return sync_to_async(_with_fresh_connection(func), thread_sensitive=False, executor=DB_EXECUTOR)
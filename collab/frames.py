@@ -0,0 +1,81 @@
+# collab/frames.py
+"""
+그룹 브로드캐스트용 "한 번만 인코딩" 프레임.
+- 보내는 쪽이 클라이언트에 나갈 JSON 문자열(frame)을 미리 만들어 group_send에 실어 보냄
+- 받는 컨슈머는 frame을 그대로 send(text_data=...) → M명 방에서 json.dumps M번 → 1번
+- 컨슈머가 내용을 들여다봐야 하는 이벤트(owner_changed, occupancy)만 payload dict도 함께 실음
+- 방 메시지는 msgpack 서브프로토콜 클라이언트용 바이너리 프레임(bin)도 함께 한 번 인코딩
+frame이 없는 예전 형식 메시지는 핸들러가 payload를 직접 인코딩(호환).
+"""
+from .codec import MSGPACK_AVAILABLE, dumps, loads, pack
+
+# 수신 컨슈머가 payload를 읽어 상태를 바꾸거나 필터링하는 이벤트
+_ROOM_INSPECTED = {"owner_changed"}     # RoomPresenceConsumer.owner_id 갱신
+_LOBBY_INSPECTED = {"occupancy"}        # LobbyConsumer 빈자리(free=1) 필터
+
+
+def encode_frame(payload: dict) -> str:
+    return dumps(payload)
+
+
+def room_event(payload: dict) -> dict:
+    """group_send용 room.event 메시지(frame 포함)."""
+    msg = {"type": "room.event", "frame": encode_frame(payload),
+           "kind": payload.get("action") or payload.get("event")}   # 송신 큐가 버릴 수 있는 프레임인지 판단용
+    if MSGPACK_AVAILABLE:
+        msg["bin"] = pack(payload)
+    if payload.get("event") in _ROOM_INSPECTED:
+        msg["payload"] = payload
+    return msg
+
+
+def lobby_event(payload: dict) -> dict:
+    """group_send용 lobby.event 메시지(frame 포함)."""
+    msg = {"type": "lobby.event", "frame": encode_frame(payload)}
+    if payload.get("event") in _LOBBY_INSPECTED:
+        msg["payload"] = payload
+    return msg
+
+
+def chat_message(*, message: str, sender: str, message_id, ts: str) -> dict:
+    """group_send용 chat.message 메시지(클라이언트 `chat` 이벤트 frame 포함)."""
+    payload = {
+        "event": "chat",
+        "user": sender,
+        "message": message,
+        "message_id": message_id,
+        "ts": ts,
+    }
+    msg = {"type": "chat.message", "frame": encode_frame(payload), "kind": "chat"}
+    if MSGPACK_AVAILABLE:
+        msg["bin"] = pack(payload)
+    return msg
+
+
+def prepare(message: dict) -> dict:
+    """
+    저장된 형태({"type": "room.event"|"lobby.event", "payload": {...}}) → 전송용(frame/bin 포함).
+    아웃박스처럼 JSON으로 보관했다가 나중에 보내는 경우, 보낼 때 한 번만 인코딩.
+    """
+    build = {"room.event": room_event, "lobby.event": lobby_event}.get(message.get("type"))
+    if build and "frame" not in message and isinstance(message.get("payload"), dict):
+        return build(message["payload"])
+    return message
+
+
+async def send_event(consumer, event: dict, payload=None) -> None:
+    """미리 인코딩된 frame이 있으면 그대로, 없으면 payload를 인코딩해서 전송."""
+    frame = event.get("frame")
+    kind = event.get("kind")
+    send_frame = getattr(consumer, "send_frame", None)      # 송신 큐가 있는 컨슈머는 kind까지 넘김
+    send = (lambda **kw: send_frame(kind=kind, **kw)) if send_frame else consumer.send
+    if getattr(consumer, "binary", False):        # msgpack 서브프로토콜 접속
+        data = event.get("bin")
+        if data is None:
+            data = pack(payload if payload is not None else loads(frame))
+        await send(bytes_data=data)
+        return
+    if frame is not None:
+        await send(text_data=frame)
+    else:
+        await send(text_data=encode_frame(payload))
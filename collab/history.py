@@ -0,0 +1,52 @@
+# collab/history.py
+"""
+채팅/이미지 히스토리 페이지(최신순, 페이지당 MESSAGE_PAGE_SIZE개).
+- message_page():  HTTP API(api_messages_list)용 — 요청 페이지
+- amessage_page(): 방 WS 입장 bootstrap용 — 첫 페이지를 async ORM으로(같은 응답 형태)
+"""
+import math
+
+from django.core.paginator import Paginator
+
+from .image_pipeline import variant_urls
+from .models import Message
+
+MESSAGE_PAGE_SIZE = 50
+
+
+def serialize_message(m: Message) -> dict:
+    return {
+        "id": m.id,
+        "user": getattr(m.user, "username", str(m.user_id)),
+        "content": m.content,
+        "image_url": (m.image.url if m.image else None),
+        "width": m.image_width,
+        "height": m.image_height,
+        "variants": (variant_urls(m) if m.image else {}),
+        "ts": m.created_at.isoformat(),
+    }
+
+
+def _room_messages(room_id: int):
+    return Message.objects.filter(room_id=room_id).select_related("user")
+
+
+def message_page(room_id: int, page=1) -> dict:
+    p = Paginator(_room_messages(room_id), MESSAGE_PAGE_SIZE)
+    page_obj = p.get_page(page)
+    return {
+        "page": page_obj.number,
+        "num_pages": p.num_pages,
+        "results": [serialize_message(m) for m in page_obj.object_list],
+    }
+
+
+async def amessage_page(room_id: int) -> dict:
+    qs = _room_messages(room_id)
+    count = await qs.acount()
+    rows = [m async for m in qs[:MESSAGE_PAGE_SIZE]]
+    return {
+        "page": 1,
+        "num_pages": max(1, math.ceil(count / MESSAGE_PAGE_SIZE)),   # Paginator와 같게(빈 방도 1)
+        "results": [serialize_message(m) for m in rows],
+    }
@@ -0,0 +1,124 @@
+# collab/image_pipeline.py
+"""
+업로드 이미지 후처리 파이프라인(요청 경로 밖).
+1) 업로드 뷰가 커밋 후 enqueue_image_processing() 호출 → 즉시 반환
+2) spawn 프로세스 풀에서 리사이즈/인코딩(collab/imaging.py, CPU 작업은 GIL 밖)
+3) 완료되면 단일 스레드 큐에서 Message에 크기/변형본 기록 + 같은 트랜잭션에 `image.ready` 아웃박스 행
+   (Redis가 잠깐 끊겨도 변형본 교체 알림이 사라지지 않음, collab/outbox.py)
+"""
+import logging
+import multiprocessing
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+
+from . import outbox
+from .imaging import render_variants
+from .models import Message
+from .storage import get_image_storage
+
+logger = logging.getLogger("collab")
+
+VARIANTS_DIR = "room_images/variants"   # MEDIA_ROOT 기준, 메시지별 하위 폴더
+
+_pool: ProcessPoolExecutor | None = None
+_finisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-finish")  # DB 반영/브로드캐스트 전용
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # fork 대신 spawn: daphne(멀티스레드) 프로세스를 fork하면 락/커넥션 상태가 꼬일 수 있음
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_PIPELINE_WORKERS", 2),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def variants_dir(message_id: int) -> str:
+    return f"{VARIANTS_DIR}/{message_id}"
+
+
+def variant_urls(message: Message) -> dict:
+    """저장된 변형본 메타 → 클라이언트용 {"thumb": {"width","height","webp": url, "avif": url}, ...}."""
+    out = {}
+    for name, v in (message.image_variants or {}).items():
+        item = {"width": v.get("width"), "height": v.get("height")}
+        for fmt, path in (v.get("files") or {}).items():
+            item[fmt] = default_storage.url(path)
+        out[name] = item
+    return out
+
+
+def delete_variants(message_id: int) -> None:
+    """메시지 변형본 폴더 통째로 삭제(없으면 무시)."""
+    shutil.rmtree(default_storage.path(variants_dir(message_id)), ignore_errors=True)
+
+
+def enqueue_image_processing(message_id: int, image_name: str) -> None:
+    """변형본 생성 예약. 실패해도 원본은 그대로 쓸 수 있으므로 예외를 밖으로 내지 않음."""
+    try:
+        fut = _get_pool().submit(
+            render_variants,
+            get_image_storage().path(image_name),
+            default_storage.path(variants_dir(message_id)),
+        )
+    except Exception:
+        logger.exception("image pipeline submit failed (message=%s)", message_id)
+        return
+    fut.add_done_callback(lambda f: _finisher.submit(_finish, message_id, f))
+
+
+def _finish(message_id: int, fut) -> None:
+    try:
+        result = fut.result()
+    except Exception:
+        logger.exception("image render failed (message=%s)", message_id)
+        return
+
+    close_old_connections()
+    try:
+        vdir = variants_dir(message_id)
+        stored = {
+            name: {
+                "width": v["width"],
+                "height": v["height"],
+                "files": {fmt: f"{vdir}/{fn}" for fmt, fn in v["files"].items()},
+            }
+            for name, v in result["variants"].items()
+        }
+        with transaction.atomic():
+            room_id = Message.objects.filter(pk=message_id).values_list("room_id", flat=True).first()
+            updated = Message.objects.filter(pk=message_id).update(
+                image_width=result["width"],
+                image_height=result["height"],
+                image_variants=stored,
+            ) if room_id is not None else 0
+            if updated:
+                msg = Message(pk=message_id, image_variants=stored)
+                outbox.publish(
+                    f"room_{room_id}",
+                    {
+                        "type": "image.ready",
+                        "message_id": message_id,
+                        "width": result["width"],
+                        "height": result["height"],
+                        "variants": variant_urls(msg),
+                    },
+                )
+        if not updated:
+            delete_variants(message_id)     # 처리 중에 메시지가 삭제됨 → 결과물 정리
+            return
+
+        logger.info("[단계] 이미지 변형본 준비 완료 message=%s variants=%s", message_id, list(stored))
+    except Exception:
+        logger.exception("image pipeline finish failed (message=%s)", message_id)
+    finally:
+        connection.close()   # 파이프라인 스레드가 커넥션을 붙잡고 있지 않도록
@@ -0,0 +1,79 @@
+# collab/imaging.py
+"""
+업로드 이미지 리사이즈/인코딩 (순수 Pillow 코드).
+- Django를 import하지 않음 → spawn 프로세스 풀에서 그대로 import/실행 가능
+- 원본은 건드리지 않고, 폭 기준으로 줄인 WebP(+가능하면 AVIF) 변형본을 out_dir에 기록
+"""
+import os
+
+from PIL import Image, ImageOps, features
+
+# 변형본 이름 → 최대 폭(px). 원본보다 크게 늘리지 않음
+VARIANT_WIDTHS = {
+    "thumb": 320,     # 채팅/목록 썸네일
+    "md": 1280,       # 캐러셀 기본 표시용
+}
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+
+# 업로드 허용 포맷(Pillow format → 저장 확장자). 확장자는 클라 파일명이 아니라 실제 내용으로 정함
+UPLOAD_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+
+
+def avif_supported() -> bool:
+    """Pillow 빌드에 AVIF 인코더가 있는지(11.2+ 또는 pillow-avif-plugin)."""
+    try:
+        return bool(features.check("avif"))
+    except Exception:
+        return False
+
+
+def detect_upload_ext(fileobj):
+    """Pillow로 열어 검증 → 허용 포맷이면 확장자(".jpg" 등), 아니면 None. 파일 위치는 처음으로 되돌림."""
+    try:
+        fileobj.seek(0)
+        with Image.open(fileobj) as im:
+            fmt = im.format
+            im.verify()
+    except Exception:            # 이미지 아님/손상/압축 폭탄
+        return None
+    finally:
+        fileobj.seek(0)
+    return UPLOAD_FORMATS.get(fmt)
+
+
+def _prepare(im: Image.Image) -> Image.Image:
+    im = ImageOps.exif_transpose(im)          # 휴대폰 사진 회전 정보 반영
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+    return im
+
+
+def render_variants(src_path: str, out_dir: str) -> dict:
+    """
+    src_path 이미지를 읽어 out_dir/<이름>.<포맷> 으로 변형본 생성.
+    반환: {"width": 원본폭, "height": 원본높이,
+           "variants": {"thumb": {"width":..,"height":..,"files":{"webp":"thumb.webp", ...}}, ...}}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    formats = ["webp"] + (["avif"] if avif_supported() else [])
+
+    with Image.open(src_path) as raw:
+        im = _prepare(raw)
+        width, height = im.size
+        variants = {}
+        for name, max_w in VARIANT_WIDTHS.items():
+            v = im
+            if width > max_w:
+                v = im.resize((max_w, max(1, round(height * max_w / width))), Image.LANCZOS)
+            files = {}
+            for fmt in formats:
+                filename = f"{name}.{fmt}"
+                if fmt == "webp":
+                    v.save(os.path.join(out_dir, filename), "WEBP", quality=WEBP_QUALITY, method=4)
+                else:
+                    v.save(os.path.join(out_dir, filename), "AVIF", quality=AVIF_QUALITY)
+                files[fmt] = filename
+            variants[name] = {"width": v.width, "height": v.height, "files": files}
+
+    return {"width": width, "height": height, "variants": variants}
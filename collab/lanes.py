@@ -0,0 +1,42 @@
+# collab/lanes.py
+"""
+방 트래픽 우선순위 레인(control / chat / draw).
+- control: 강퇴, 방 삭제, 방장 변경, 입장/퇴장, 이미지 승인, 캐러셀 이동 등 → 그룹 room_<id>, 핸들러가 바로 처리
+- chat:    채팅                             → 그룹 room_<id>_chat
+- draw:    draw.stroke/clear                 → 그룹 room_<id>_draw
+모든 레인은 컨슈머의 기본 채널 하나로 들어옴(채널 레이어 receive()는 프로세스 단위 락을 공유하므로
+레인별 보조 채널을 따로 읽으면 조용한 레인의 reader가 락을 잡고 control 전달을 막음).
+chat/draw 메시지는 wrap()으로 type="lane.chat"/"lane.draw" 봉투에 담겨 오고, 컨슈머는 봉투를
+우선순위 큐에만 넣음 → control 핸들러는 그 뒤에 줄 서지 않고, 큐는 chat → draw 순으로 비움.
+만료(expiry): 오래 묵은 draw.stroke만 버림(버리면 resync로 스냅샷 재요청).
+draw.clear는 버리면 영구히 어긋나므로 만료 없음.
+"""
+import time
+
+CONTROL = "control"
+CHAT = "chat"
+DRAW = "draw"
+
+LANES = {
+    CHAT: {"priority": 1},
+    DRAW: {"priority": 2},
+}
+
+# 만료 시 버려도 되는(그리고 resync로 복구되는) 프레임 종류 → 초
+EXPIRY = {"draw.stroke": 2.0}
+
+
+def lane_group(room_id: int, lane: str) -> str:
+    if lane == CONTROL:
+        return f"room_{room_id}"
+    return f"room_{room_id}_{lane}"
+
+
+def wrap(message: dict, lane: str) -> dict:
+    """group_send용 레인 봉투(보낸 시각 포함). 컨슈머 핸들러 lane_chat/lane_draw가 받음."""
+    return {"type": f"lane.{lane}", "lane": lane, "sent_at": time.time(), "message": message}
+
+
+def is_expired(envelope: dict) -> bool:
+    limit = EXPIRY.get(envelope["message"].get("kind"))
+    return limit is not None and (time.time() - envelope["sent_at"]) > limit
@@ -0,0 +1,41 @@
+# collab/lobby.py
+"""
+로비 그룹 이름 규칙.
+- `lobby`              : 필터 없이 전체 방 목록을 보는 접속자
+- `lobby_topic_<key>`  : 특정 주제만 구독하는 접속자 (주제별로 필요한 이벤트만 수신)
+방 이벤트는 항상 [lobby, 해당 주제 그룹] 두 곳에만 보냄 → 다른 주제 구독자는 트래픽 0
+"""
+import hashlib
+import re
+
+LOBBY_GROUP = "lobby"
+MAX_LOBBY_TOPICS = 10        # 한 로비 연결이 구독할 수 있는 주제 수 상한
+
+# 채널 그룹명 허용 문자(ASCII 영숫자/-/_/.)만으로 된 주제는 그대로, 아니면(한글 등) 해시
+_SAFE_TOPIC = re.compile(r"^[A-Za-z0-9_.-]{1,50}$")
+
+
+def normalize_topic(topic: str | None) -> str:
+    return (topic or "").strip()[:50].lower()
+
+
+def topic_group(topic: str | None) -> str:
+    t = normalize_topic(topic) or "general"
+    if not _SAFE_TOPIC.match(t):
+        t = hashlib.sha1(t.encode("utf-8")).hexdigest()[:20]
+    return f"lobby_topic_{t}"
+
+
+def lobby_groups(topic: str | None) -> list[str]:
+    """방 하나의 로비 이벤트를 보낼 그룹들."""
+    return [LOBBY_GROUP, topic_group(topic)]
+
+
+def parse_topics(raw: str | None) -> list[str]:
+    """`topics=a,b,c` → 정규화/중복 제거된 주제 목록(최대 MAX_LOBBY_TOPICS)."""
+    out: list[str] = []
+    for part in (raw or "").split(","):
+        t = normalize_topic(part)
+        if t and t not in out:
+            out.append(t)
+    return out[:MAX_LOBBY_TOPICS]
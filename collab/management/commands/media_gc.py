@@ -0,0 +1,41 @@
+# collab/management/commands/media_gc.py
+"""
+미디어 고아 파일 정리.
+  python manage.py media_gc                    # 보고만(dry-run, 기본)
+  python manage.py media_gc --delete --rate 20 # 실제 삭제, 초당 20개 제한
+  python manage.py media_gc --delete --interval 3600   # 1시간마다 반복(사이드카 워커)
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from collab.media_gc import DEFAULT_BATCH_SIZE, DEFAULT_MIN_AGE, collect
+
+
+class Command(BaseCommand):
+    help = "room_images/avatars 아래 DB에서 참조하지 않는 파일을 찾아 정리합니다(기본 dry-run)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="실제로 삭제(없으면 보고만)")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="참조 확인 쿼리 1회당 파일 수")
+        parser.add_argument("--rate", type=float, default=0, help="초당 최대 삭제 수(0=무제한)")
+        parser.add_argument("--min-age", type=float, default=DEFAULT_MIN_AGE, help="이보다 최근(초) 파일은 건너뜀")
+        parser.add_argument("--interval", type=float, default=0, help="N초마다 반복 실행(0=1회)")
+        parser.add_argument("--list", action="store_true", help="고아 파일 경로까지 출력")
+
+    def handle(self, *args, **opts):
+        while True:
+            report = collect(
+                dry_run=not opts["delete"],
+                batch_size=opts["batch_size"],
+                rate=opts["rate"],
+                min_age=opts["min_age"],
+            )
+            self.stdout.write(json.dumps(report.as_dict(), ensure_ascii=False))
+            if opts["list"]:
+                for rel in report.orphans:
+                    self.stdout.write(f"  {rel}")
+            if not opts["interval"]:
+                return
+            time.sleep(opts["interval"])
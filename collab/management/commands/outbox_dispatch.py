@@ -0,0 +1,36 @@
+# collab/management/commands/outbox_dispatch.py
+"""
+아웃박스 이벤트 전송(ASGI 프로세스 밖에서 돌리고 싶을 때).
+  python manage.py outbox_dispatch            # 쌓인 것 1번 비우고 종료
+  python manage.py outbox_dispatch --forever  # 계속 폴링(사이드카 워커)
+ASGI(daphne) 프로세스는 WS 컨슈머가 뜰 때 디스패처를 자동으로 시작하므로 보통 필요 없음.
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from collab.outbox import OUTBOX_BATCH_SIZE, OUTBOX_POLL_SECONDS, drain_once
+
+
+class Command(BaseCommand):
+    help = "OutboxEvent 테이블에 쌓인 실시간 이벤트를 채널 레이어로 전송합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--forever", action="store_true", help="종료하지 않고 계속 폴링")
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE, help="배치당 최대 건수")
+        parser.add_argument("--interval", type=float, default=OUTBOX_POLL_SECONDS, help="빈 배치 후 대기(초)")
+
+    def handle(self, *args, **opts):
+        asyncio.run(self._run(opts))
+
+    async def _run(self, opts):
+        total = 0
+        while True:
+            n = await drain_once(opts["batch_size"])
+            total += n
+            if n >= opts["batch_size"]:
+                continue
+            if not opts["forever"]:
+                break
+            await asyncio.sleep(opts["interval"])
+        self.stdout.write(f"sent={total}")
@@ -0,0 +1,234 @@
+# collab/media_gc.py
+"""
+미디어 고아 파일 정리(GC) — 요청 경로 밖에서 실행.
+- 대상: media/room_images (원본/내용주소/변형본), media/avatars, 청크 업로드 임시 파일,
+        내용 주소 저장소가 쓰다 남긴 .upload-* 임시 파일(프로세스가 죽어 rename 못 한 것)
+- 배치(기본 500개)마다 "집합 쿼리 1회"로 참조 여부 확인 → 참조 없는 파일만 삭제
+- 업로드 중인 파일(행 커밋 전)을 지우지 않도록 최소 나이(min_age) 이하 파일은 건너뜀
+  (마지막 참조가 사라진 내용 주소 파일도 여기서만 지움 — ImageBlob.release 참고)
+- dry_run=True면 지우지 않고 보고만, rate로 초당 삭제 수 제한
+또한 요청 안에서 하던 파일 삭제는 delete_later()로 단일 백그라운드 스레드에 넘김(실패분은 GC가 회수).
+"""
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connection
+
+from .models import ImageBlob, Message
+from .image_pipeline import VARIANTS_DIR
+from .storage import CAS_PREFIX, upload_temp_dir, UPLOAD_SESSION_TTL
+
+logger = logging.getLogger("collab")
+
+ROOM_IMAGES_DIR = "room_images"
+AVATARS_DIR = "avatars"
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MIN_AGE = 60 * 60             # 1시간 이내 파일은 업로드 진행 중일 수 있어 건너뜀
+CAS_TEMP_PREFIX = ".upload-"          # storage.ContentAddressedStorage._save 의 mkstemp prefix
+
+_deleter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="media-delete")
+
+
+# ──────────────────────────────────────────────────────────────
+# 요청 경로 밖 삭제
+# ──────────────────────────────────────────────────────────────
+def _run_detached(fn: Callable, *args) -> None:
+    try:
+        fn(*args)
+    except Exception:
+        logger.exception("background media delete failed: %s%s", getattr(fn, "__name__", fn), args)
+    finally:
+        connection.close()   # 삭제 스레드가 DB 커넥션을 붙잡고 있지 않도록
+
+
+def delete_later(fn: Callable, *args) -> None:
+    """파일 삭제 작업을 백그라운드 스레드로 예약(보통 transaction.on_commit 안에서 호출)."""
+    _deleter.submit(_run_detached, fn, *args)
+
+
+# ──────────────────────────────────────────────────────────────
+# GC
+# ──────────────────────────────────────────────────────────────
+@dataclass
+class GCReport:
+    dry_run: bool
+    scanned: int = 0
+    skipped_recent: int = 0
+    orphans: list = field(default_factory=list)   # MEDIA_ROOT 기준 상대 경로
+    deleted: int = 0
+    freed_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "scanned": self.scanned,
+            "skipped_recent": self.skipped_recent,
+            "orphans": len(self.orphans),
+            "deleted": self.deleted,
+            "freed_bytes": self.freed_bytes,
+        }
+
+
+def _walk_files(root: str, rel_dir: str, exclude: tuple = (), temp_files: bool = False) -> Iterator[str]:
+    """rel_dir 아래 파일. temp_files=True면 반대로 .upload-* 임시 파일만."""
+    base = os.path.join(root, rel_dir)
+    for dirpath, dirnames, filenames in os.walk(base):
+        rel = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        dirnames[:] = [d for d in dirnames if f"{rel}/{d}" not in exclude]
+        for fn in filenames:
+            if fn.startswith(CAS_TEMP_PREFIX) != temp_files:
+                continue
+            if not temp_files and fn.startswith("."):
+                continue
+            yield f"{rel}/{fn}"
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for it in items:
+        batch.append(it)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _referenced_room_images(names: list) -> set:
+    # 메시지가 직접 가리키는 파일 ∪ 블롭 참조가 남은 파일 (UNION 쿼리 1회/배치)
+    by_message = Message.objects.filter(image__in=names).order_by().values_list("image", flat=True)
+    by_blob = ImageBlob.objects.filter(name__in=names, refcount__gt=0).values_list("name", flat=True)
+    return set(by_message.union(by_blob))
+
+
+def _referenced_avatars(names: list) -> set:
+    User = get_user_model()
+    return set(User.objects.filter(avatar__in=names).values_list("avatar", flat=True))
+
+
+def _referenced_variant_dirs(dirs: list) -> set:
+    ids = {}
+    for d in dirs:
+        try:
+            ids[int(d.rsplit("/", 1)[1])] = d
+        except ValueError:
+            continue
+    alive = Message.objects.filter(pk__in=list(ids)).values_list("pk", flat=True)
+    return {ids[pk] for pk in alive}
+
+
+class _Throttle:
+    """초당 삭제 수 제한(rate<=0 이면 무제한)."""
+
+    def __init__(self, rate: float):
+        self.interval = (1.0 / rate) if rate and rate > 0 else 0.0
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+def _sweep(report: GCReport, root: str, candidates: Iterable[str], referenced: Callable[[list], set],
+           *, batch_size: int, min_age: float, throttle: _Throttle, is_dir: bool = False) -> None:
+    cutoff = time.time() - min_age
+    for batch in _batches(candidates, batch_size):
+        report.scanned += len(batch)
+        old = []
+        for rel in batch:
+            try:
+                if os.path.getmtime(os.path.join(root, rel)) > cutoff:
+                    report.skipped_recent += 1
+                    continue
+            except OSError:
+                continue
+            old.append(rel)
+        if not old:
+            continue
+        close_old_connections()
+        refs = referenced(old)
+        for rel in old:
+            if rel in refs:
+                continue
+            report.orphans.append(rel)
+            if report.dry_run:
+                continue
+            throttle.wait()
+            path = os.path.join(root, rel)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    # 참조 확인 사이에 같은 내용이 다시 업로드됨(내용 주소 저장소는 같은 경로를 덮어씀)
+                    continue
+                if is_dir:
+                    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                    shutil.rmtree(path)
+                else:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+            except OSError as e:
+                logger.warning("GC 삭제 실패: %s (%s)", rel, e)
+                continue
+            report.deleted += 1
+            report.freed_bytes += size
+
+
+def _stale_upload_parts(max_age: float, dry_run: bool, report: GCReport) -> None:
+    """청크 업로드 중 버려진 임시 파일(세션 TTL 지난 것) 정리."""
+    base = upload_temp_dir()
+    cutoff = time.time() - max_age
+    for fn in os.listdir(base):
+        path = os.path.join(base, fn)
+        try:
+            if not fn.endswith(".part") or os.path.getmtime(path) > cutoff:
+                continue
+            report.orphans.append(f"<upload-tmp>/{fn}")
+            if not dry_run:
+                size = os.path.getsize(path)
+                os.remove(path)
+                report.deleted += 1
+                report.freed_bytes += size
+        except OSError:
+            continue
+
+
+def collect(*, dry_run: bool = True, batch_size: int = DEFAULT_BATCH_SIZE,
+            rate: float = 0, min_age: float = DEFAULT_MIN_AGE) -> GCReport:
+    """고아 미디어 파일 정리 1회 실행."""
+    root = str(settings.MEDIA_ROOT)
+    report = GCReport(dry_run=dry_run)
+    throttle = _Throttle(rate)
+
+    # 1) 방 이미지 파일(변형본 폴더 제외)
+    _sweep(report, root, _walk_files(root, ROOM_IMAGES_DIR, exclude=(VARIANTS_DIR,)),
+           _referenced_room_images, batch_size=batch_size, min_age=min_age, throttle=throttle)
+
+    # 2) 변형본 폴더: 메시지 id가 사라진 폴더 통째로
+    vroot = os.path.join(root, VARIANTS_DIR)
+    vdirs = (f"{VARIANTS_DIR}/{d}" for d in (os.listdir(vroot) if os.path.isdir(vroot) else []))
+    _sweep(report, root, vdirs, _referenced_variant_dirs,
+           batch_size=batch_size, min_age=min_age, throttle=throttle, is_dir=True)
+
+    # 3) 아바타(교체되어 아무도 안 쓰는 파일)
+    _sweep(report, root, _walk_files(root, AVATARS_DIR),
+           _referenced_avatars, batch_size=batch_size, min_age=min_age, throttle=throttle)
+
+    # 4) 청크 업로드 잔여 임시 파일
+    _stale_upload_parts(max(min_age, UPLOAD_SESSION_TTL), dry_run, report)
+
+    # 5) 내용 주소 저장소의 .upload-* 임시 파일: 정상이면 곧바로 rename되므로 min_age보다 오래된 건 잔여물
+    _sweep(report, root, _walk_files(root, CAS_PREFIX, temp_files=True),
+           lambda names: set(), batch_size=batch_size, min_age=min_age, throttle=throttle)
+
+    logger.info("[단계] 미디어 GC 완료 %s", report.as_dict())
+    return report
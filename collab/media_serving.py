@@ -0,0 +1,188 @@
+# collab/media_serving.py
+"""
+MEDIA_ROOT 파일을 ASGI 단에서 직접 서빙(Django 뷰/미들웨어를 거치지 않음).
+- ETag/Last-Modified → If-None-Match / If-Modified-Since 가 맞으면 304 (본문 없음)
+- Range(단일 구간) → 206 + Content-Range, If-Range 지원
+- 경로가 바뀌지 않는 파일(room_images/%Y/%m/%d, 내용 주소 cas)은 Cache-Control: immutable
+  → 캐러셀 이동(image.goto)으로 같은 사진을 다시 봐도 브라우저 캐시에서 바로 표시
+- 서버가 zerocopysend/pathsend 확장을 지원하면 sendfile로 커널이 바로 전송, 아니면 64KB씩 스레드에서 읽어 스트리밍
+- 업로드 파일은 확장자를 믿지 않음: 허용한 래스터 이미지 타입만 인라인, 그 외(.html/.svg 등)는
+  application/octet-stream + Content-Disposition: attachment, 항상 X-Content-Type-Options: nosniff
+기본은 DEBUG일 때만 켜짐(운영은 Nginx/S3). 운영에서도 쓰려면 MEDIA_SERVE_ASGI=1.
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+STREAM_BLOCK = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# 날짜 분할 원본(upload_to="room_images/%Y/%m/%d")과 내용 주소 파일 → 같은 경로 = 같은 내용
+IMMUTABLE_RE = re.compile(r"^room_images/(?:\d{4}/\d{2}/\d{2}|cas)/")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# 브라우저가 그대로 표시해도 스크립트가 실행될 수 없는 타입만 인라인(SVG 제외)
+INLINE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/avif"}
+NOSNIFF = (b"x-content-type-options", b"nosniff")
+
+
+def cache_control_for(rel_path: str) -> str:
+    if IMMUTABLE_RE.match(rel_path):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    # 아바타/변형본 등은 바뀔 수 있음 → 매번 재검증(대부분 304)
+    return "public, no-cache"
+
+
+def _etag(st: os.stat_result) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _not_modified(headers: dict, etag: str, mtime: float) -> bool:
+    inm = headers.get("if-none-match")
+    if inm is not None:   # If-None-Match가 있으면 If-Modified-Since는 무시(RFC 9110)
+        tags = [t.strip() for t in inm.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    ims = headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(value: str, size: int):
+    """'bytes=a-b' 단일 구간만 지원 → (start, end) 포함 구간, 만족 불가면 ValueError, 무시할 형식이면 None."""
+    m = _RANGE_RE.match(value.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None                       # 다중 구간 등은 전체 응답(200)으로 처리
+    first, last = m.group(1), m.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:                                 # bytes=-N : 마지막 N바이트
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+class MediaFilesApp:
+    """
+    ASGI 래퍼: MEDIA_URL 아래 GET/HEAD 요청만 가로채고 나머지는 inner(Django)로 넘김.
+    config/asgi.py 에서 "http": MediaFilesApp(django_asgi_app) 로 연결.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.prefix = settings.MEDIA_URL
+        self.root = os.path.realpath(settings.MEDIA_ROOT)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            return await self.inner(scope, receive, send)
+        if scope["method"] not in ("GET", "HEAD"):
+            return await self._simple(send, 405, extra=[(b"allow", b"GET, HEAD")])
+
+        rel = scope["path"][len(self.prefix):]
+        path = os.path.realpath(os.path.join(self.root, rel))
+        if not path.startswith(self.root + os.sep):          # ../ 로 MEDIA_ROOT 밖을 가리키는 요청 차단
+            return await self._simple(send, 404)
+        try:
+            st = await sync_to_async(os.stat, thread_sensitive=False)(path)
+        except OSError:
+            return await self._simple(send, 404)
+        if not os.path.isfile(path):
+            return await self._simple(send, 404)
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        etag = _etag(st)
+        base = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(st.st_mtime, usegmt=True).encode()),
+            (b"cache-control", cache_control_for(rel).encode()),
+            (b"accept-ranges", b"bytes"),
+            NOSNIFF,
+        ]
+        if _not_modified(headers, etag, st.st_mtime):
+            return await self._simple(send, 304, extra=base)
+
+        size = st.st_size
+        status, start, end = 200, 0, size - 1
+        rng = headers.get("range")
+        if rng and size and self._if_range_ok(headers.get("if-range"), etag, st.st_mtime):
+            try:
+                parsed = _parse_range(rng, size)
+            except ValueError:
+                return await self._simple(send, 416, extra=base + [(b"content-range", f"bytes */{size}".encode())])
+            if parsed:
+                status, (start, end) = 206, parsed
+
+        ctype, _ = mimetypes.guess_type(path)
+        length = end - start + 1 if size else 0
+        resp = base + [(b"content-length", str(length).encode())]
+        if ctype in INLINE_TYPES:
+            resp.append((b"content-type", ctype.encode()))
+        else:
+            resp += [(b"content-type", b"application/octet-stream"), (b"content-disposition", b"attachment")]
+        if status == 206:
+            resp.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": resp})
+        if scope["method"] == "HEAD" or not length:
+            return await send({"type": "http.response.body", "body": b""})
+        await self._send_file(scope, send, path, start, length, whole=(status == 200))
+
+    @staticmethod
+    def _if_range_ok(if_range, etag: str, mtime: float) -> bool:
+        """If-Range 검증값이 현재 파일과 다르면 Range를 무시하고 전체를 보냄."""
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    async def _send_file(self, scope, send, path, start, length, *, whole):
+        ext = scope.get("extensions") or {}
+        if whole and "http.response.pathsend" in ext:
+            # 서버가 경로를 받아 직접 sendfile
+            return await send({"type": "http.response.pathsend", "path": path})
+
+        f = await sync_to_async(open, thread_sensitive=False)(path, "rb")
+        try:
+            if "http.response.zerocopysend" in ext:
+                return await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f, "offset": start, "count": length,
+                })
+            read = sync_to_async(f.read, thread_sensitive=False)
+            if start:
+                await sync_to_async(f.seek, thread_sensitive=False)(start)
+            remaining = length
+            while remaining > 0:
+                chunk = await read(min(STREAM_BLOCK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:                       # 전송 중 파일이 줄어든 경우에도 응답은 닫아줌
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            f.close()
+
+    @staticmethod
+    async def _simple(send, status: int, extra=()):
+        headers = [(b"content-length", b"0"), *extra]
+        if NOSNIFF not in headers:
+            headers.append(NOSNIFF)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
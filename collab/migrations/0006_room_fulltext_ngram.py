@@ -0,0 +1,30 @@
+# 방 제목/주제 검색용 FULLTEXT(ngram) 인덱스 — MySQL에서만 생성
+
+from django.db import migrations
+
+INDEX_NAME = "collab_room_name_topic_ft"
+
+
+def add_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return  # sqlite 등 개발 DB는 icontains 폴백 사용(collab/search.py)
+    schema_editor.execute(
+        f"ALTER TABLE `collab_room` ADD FULLTEXT INDEX `{INDEX_NAME}` (`Romname`, `topic`) WITH PARSER ngram"
+    )
+
+
+def drop_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(f"ALTER TABLE `collab_room` DROP INDEX `{INDEX_NAME}`")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collab', '0005_remove_roommember_uniq_owner_per_room_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext, drop_fulltext),
+    ]
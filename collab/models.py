@@ -1,10 +1,17 @@
 # models.py
+import logging
+from collections import Counter, defaultdict
 from django.db import models, transaction             # ORM + 트랜잭션
 from django.conf import settings                      # AUTH_USER_MODEL 참조
 from django.utils.text import slugify                 # 한글/공백 → 슬러그
 from django.utils import timezone                     # 시간 기록
 from django.core.exceptions import PermissionDenied,ValidationError  # 권한 예외 (403로 매핑 쉬움)
 from django.contrib.auth.models import AnonymousUser  # 로그인 확인
+from django.db.models import F                        # 참조 카운터 원자적 증감
+
+from .storage import CAS_PREFIX, get_image_storage   # 내용 주소(해시) 이미지 저장소
+
+logger = logging.getLogger("collab")
 
 ROLE_OWNER = "owner"
 ROLE_MEMBER = "member"                     # 조건부 UniqueConstraint에 필요
@@ -39,6 +46,39 @@ class Room(models.Model):
     capacity   = models.PositiveSmallIntegerField(default=20)          # 정원
     updated_at = models.DateTimeField(auto_now=True)                   # 갱신 시각
 
+    # 로비 목록에 보이는 필드(이 값들이 안 바뀐 저장은 로비에 알릴 필요 없음)
+    LOBBY_FIELDS = ("Romname", "topic", "is_private", "capacity", "password", "created_by_id")
+
+    # DB에서 읽은 시점의 로비 필드 스냅샷 → 저장 시 실제 바뀐 필드만 골라 브로드캐스트(signals.py)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        inst = super().from_db(db, field_names, values)
+        inst.snapshot_lobby_fields()
+        return inst
+
+    def snapshot_lobby_fields(self):
+        self._lobby_loaded = {f: self.__dict__[f] for f in self.LOBBY_FIELDS if f in self.__dict__}
+
+    def lobby_changes(self, update_fields=None) -> dict:
+        """
+        마지막 스냅샷 대비 바뀐 로비 필드 {필드: 새 값}.
+        - update_fields가 있으면 그 필드만 후보 (created_by → created_by_id)
+        - 스냅샷에 없는 필드(지연 로딩/새 인스턴스)는 바뀐 것으로 간주
+        """
+        loaded = getattr(self, "_lobby_loaded", {})
+        candidates = self.LOBBY_FIELDS
+        if update_fields is not None:
+            names = {("created_by_id" if f == "created_by" else f) for f in update_fields}
+            candidates = [f for f in self.LOBBY_FIELDS if f in names]
+        changes = {}
+        for f in candidates:
+            if f not in self.__dict__:
+                continue
+            new = self.__dict__[f]
+            if f not in loaded or loaded[f] != new:
+                changes[f] = new
+        return changes
+
     # 읽기 전용 속성: name → 실제 필드는 Romname 이지만 일관된 접근을 위해 제공
     @property
     def name(self) -> str:
@@ -101,28 +141,20 @@ class Room(models.Model):
         self.save()
 
         if broadcast:
-            try:
-                from channels.layers import get_channel_layer
-                from asgiref.sync import async_to_sync
-                channel_layer = get_channel_layer()
-                async_to_sync(channel_layer.group_send)(
-                    f"room_{self.id}",
-                    {
-                        "type": "room.event",     # 컨슈머의 핸들러 이름
-                        "event": "room.updated",  # 프론트에서 분기 처리
-                        "payload": {
-                            "slug": self.slug,
-                            "name": self.Romname,
-                            "topic": self.topic,
-                            "is_private": self.is_private,
-                            "capacity": self.capacity,
-                            "requires_password": self.requires_password,
-                        },
-                    },
-                )
-            except Exception:
-                # 채널 레이어가 아직 준비 전이거나 테스트 환경일 수 있으므로, 갱신 자체는 계속 진행
-                pass
+            # 같은 트랜잭션에 아웃박스 행만 기록 → 커밋되면 디스패처가 전송(Redis 장애에도 유실 없음)
+            from .outbox import publish          # 순환 import 방지(지연 import)
+            publish(f"room_{self.id}", {
+                "type": "room.event",     # 컨슈머의 핸들러 이름
+                "payload": {
+                    "event": "room.updated",  # 프론트에서 분기 처리
+                    "slug": self.slug,
+                    "name": self.Romname,
+                    "topic": self.topic,
+                    "is_private": self.is_private,
+                    "capacity": self.capacity,
+                    "requires_password": self.requires_password,
+                },
+            })
 
             # def _lobby_updated():
             #     try:
@@ -161,63 +193,25 @@ class Room(models.Model):
         room_slug = self.slug
         room_name = self.Romname
 
-        # 3) 브로드캐스트가 켜져 있으면, 트랜잭션 커밋 이후에만 이벤트를 쏘도록 예약
+        # 3) 브로드캐스트가 켜져 있으면, 삭제와 같은 트랜잭션에 아웃박스 행 기록
+        #    - 정합성 보장: 롤백되면 같이 사라지고, 커밋되면 디스패처가 반드시 전송
+        #    - 방 탭을 열어둔 사용자에게 즉시 안내/리다이렉트 용 (로비 room_deleted는 signals가 담당)
         if broadcast:
-            def _after_commit_broadcasts():
-                """
-                DB 커밋이 확정된 '이후'에만 실행.
-                - 정합성 보장: 롤백되면 전송 안 됨
-                - 프론트 즉시 재조회 시 404/레이스 조건 완화
-                """
-                try:
-                    from channels.layers import get_channel_layer
-                    from asgiref.sync import async_to_sync
-                    channel_layer = get_channel_layer()
-
-                    # (선택) 방 참여자 그룹에 'room.deleted' 통지
-                    # - 방 탭을 열어둔 사용자에게 즉시 안내/리다이렉트 용
-                    async_to_sync(channel_layer.group_send)(
-                        f"room_{room_id}",
-                        {
-                            "type": "room.event",
-                            "event": "room.deleted",
-                            "payload": {
-                                # 표준 키
-                                "room_id": room_id,
-                                "room_slug": room_slug,
-                                "room_name": room_name,
-
-                                # (임시 호환용) 구키 — 프론트 이전 완료 후 삭제 가능
-                                "slug": room_slug,
-                                "name": room_name,
-                            },
-                        },
-                    )
-
-                    # 로비에 'room_deleted' 단 1회만 통지 (중복 전송 금지)
-                #     async_to_sync(channel_layer.group_send)(
-                #         "lobby",
-                #         {
-                #             "type": "lobby.event",
-                #             "payload": {
-                #                 "event": "room_deleted",
-                #                 # 표준 키
-                #                 "room_id": room_id,
-                #                 "room_slug": room_slug,
-                #                 "room_name": room_name,
-
-                #                 # (임시 호환용) 구키 — 프론트 이전 완료 후 삭제 가능
-                #                 "slug": room_slug,
-                #                 "name": room_name,
-                #             },
-                #         },
-                #     )
-                except Exception:
-                    # 채널 레이어 미준비/테스트 환경 등은 무시(삭제 자체는 계속 진행)
-                    pass
-
-            # 커밋 후 실행 예약
-            transaction.on_commit(_after_commit_broadcasts)
+            from .outbox import publish          # 순환 import 방지(지연 import)
+            publish(f"room_{room_id}", {
+                "type": "room.event",
+                "payload": {
+                    "event": "room.deleted",
+                    # 표준 키
+                    "room_id": room_id,
+                    "room_slug": room_slug,
+                    "room_name": room_name,
+
+                    # (임시 호환용) 구키 — 프론트 이전 완료 후 삭제 가능
+                    "slug": room_slug,
+                    "name": room_name,
+                },
+            })
 
         # 4) 실제 삭제 수행 (CASCADE로 멤버십/메시지 등 함께 삭제)
         super(Room, self).delete()
@@ -385,7 +379,11 @@ class Message(models.Model):
     room = models.ForeignKey('Room', on_delete=models.CASCADE, related_name='messages')  # 메시지의 방
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)         # 작성자/업로더
     content = models.TextField(blank=True)                                              # 텍스트(없어도 됨)
-    image = models.ImageField(upload_to='room_images/%Y/%m/%d/', null=True, blank=True) # 이미지(없어도 됨)
+    image = models.ImageField(upload_to='room_images/%Y/%m/%d/', storage=get_image_storage,
+                              null=True, blank=True)                                    # 이미지(없어도 됨, 내용 해시 경로로 저장)
+    image_width = models.PositiveIntegerField(null=True, blank=True)                    # 원본 폭(후처리 후 채움)
+    image_height = models.PositiveIntegerField(null=True, blank=True)                   # 원본 높이
+    image_variants = models.JSONField(default=dict, blank=True)                         # 리사이즈 변형본 메타(image_pipeline)
     created_at = models.DateTimeField(auto_now_add=True)                                 # 생성 시각
 
     class Meta:
@@ -401,4 +399,87 @@ class Message(models.Model):
 
     def is_image(self) -> bool:
         return bool(self.image)
-    
\ No newline at end of file
+    
+
+
+# ──────────────────────────────────────────────────────────────────────
+# 이미지 블롭 참조 카운트 (ImageBlob)
+# 같은 내용의 이미지는 파일 1개(storage.ContentAddressedStorage) + 이 행의 refcount로 공유
+# ──────────────────────────────────────────────────────────────────────
+class ImageBlob(models.Model):
+    name       = models.CharField(max_length=255, unique=True)   # 저장소 기준 경로(room_images/cas/..)
+    refcount   = models.PositiveIntegerField(default=0)          # 이 파일을 가리키는 Message 수
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} (x{self.refcount})"
+
+    @classmethod
+    def acquire(cls, name: str) -> None:
+        """참조 +1 (없으면 생성)."""
+        cls.acquire_many([name])
+
+    @classmethod
+    @transaction.atomic
+    def acquire_many(cls, names) -> None:
+        """
+        여러 파일 참조 +1을 한 번에.
+        없는 행은 refcount=0으로 INSERT IGNORE(동시에 같은 이름을 넣어도 충돌 없음) → 전부 F() 증가.
+        """
+        counts = Counter(names)
+        if not counts:
+            return
+        cls.objects.bulk_create([cls(name=n, refcount=0) for n in counts], ignore_conflicts=True)
+        by_inc = defaultdict(list)                     # 같은 증가량끼리 UPDATE 1번
+        for n, c in counts.items():
+            by_inc[c].append(n)
+        for inc, group in by_inc.items():
+            cls.objects.filter(name__in=group).update(refcount=F("refcount") + inc)
+
+    @classmethod
+    @transaction.atomic
+    def release(cls, name: str) -> bool:
+        """
+        참조 -1. 마지막 참조였으면 행만 지우고, 실제 파일은 media_gc 가 유예 시간(min_age) 뒤 회수.
+        (같은 내용이 동시에 다시 업로드되면 저장소는 행 커밋 전에 같은 경로를 덮어씀 →
+         여기서 바로 지우면 그 새 메시지의 파일이 사라짐. 덮어쓰기는 mtime을 갱신하므로 GC가 건너뜀)
+        반환: 파일 삭제를 예약했으면 True
+        - 블롭 행이 없는 파일(내용 주소 저장소 도입 전 업로드)은 예전처럼 1:1 → 커밋 후 바로 삭제
+        """
+        blob = cls.objects.select_for_update().filter(name=name).first()
+        if blob is not None or name.startswith(CAS_PREFIX + "/"):
+            if blob is None:
+                return False
+            if blob.refcount > 1:
+                cls.objects.filter(pk=blob.pk).update(refcount=F("refcount") - 1)
+            else:
+                blob.delete()
+            return False
+
+        def _delete_file():
+            try:
+                get_image_storage().delete(name)
+            except Exception:
+                logger.warning("파일 삭제 실패: %s", name)
+        from .media_gc import delete_later          # 순환 import 방지(지연 import)
+        transaction.on_commit(lambda: delete_later(_delete_file))   # 요청 스레드에서 파일 I/O 안 함
+        return True
+
+
+
+# ──────────────────────────────────────────────────────────────
+# 실시간 이벤트 아웃박스: 도메인 변경과 "같은 트랜잭션"에 이벤트 행을 기록
+# → 커밋되면 반드시 전송(Redis 장애 시 재시도), 롤백되면 같이 사라짐 (collab/outbox.py)
+# ──────────────────────────────────────────────────────────────
+class OutboxEvent(models.Model):
+    group        = models.CharField(max_length=200)                    # channel layer 그룹 이름
+    message      = models.JSONField()                                  # group_send 메시지(type + 내용)
+    attempts     = models.PositiveIntegerField(default=0)              # 전송 실패 횟수
+    available_at = models.DateTimeField(default=timezone.now, db_index=True)   # 이 시각 이후 전송(임대/재시도 백오프)
+    created_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} → {self.group} ({self.message.get('type')})"
@@ -0,0 +1,122 @@
+# collab/occupancy.py
+"""
+로비용 방별 현재 인원(occupancy) 집계 + 스로틀 브로드캐스트.
+- 인원 계산은 항상 "그룹 집계 쿼리 1회"(room_id별 COUNT)로 처리
+- WS 입장/퇴장마다 로비에 쏘지 않고, 변경된 방을 모아 1초에 한 번 `occupancy` 이벤트로 묶어 전송
+  → 로비 팬아웃이 (입장 횟수 × 로비 접속자)로 커지지 않음
+- 변경 표시된 방은 다시 센 값을 항상 보냄(이전에 보낸 값과 비교 안 함): 여러 ASGI 프로세스가 같은 방을
+  번갈아 보내므로 프로세스 로컬 "마지막 전송값"으로 생략하면 다른 프로세스가 보낸 값이 남아 어긋남
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.db.models import Count, Q
+
+from .frames import lobby_event
+from .lobby import LOBBY_GROUP, topic_group
+from .models import Room, RoomMember
+
+logger = logging.getLogger("lobby")
+
+OCCUPANCY_FLUSH_SECONDS = 1.0   # 로비 occupancy 이벤트 최소 간격(초)
+
+# 프로세스(이벤트 루프) 단위 상태 — 전부 이벤트 루프 스레드에서만 접근
+_dirty: Set[int] = set()                     # 다음 플러시 때 다시 셀 방 id
+_flush_task: Optional[asyncio.Task] = None   # 예약된 플러시 작업(1개만)
+
+
+# 현재 인원으로 치는 멤버 조건: 밴 X + 열린 연결 1개 이상 (Room.can_enter 정원 체크와 동일)
+ACTIVE_MEMBER_Q = Q(memberships__is_banned=False, memberships__open_conn__gt=0)
+
+
+def occupancy_annotation():
+    """Room 쿼리셋에 붙일 현재 인원 집계식 (annotate(occupancy=...) 용)."""
+    return Count("memberships", filter=ACTIVE_MEMBER_Q)
+
+
+def room_occupancy(room_ids: Iterable[int]) -> Dict[int, int]:
+    """room_id → 현재 인원. GROUP BY room_id 쿼리 1회로 계산(인원 0인 방은 0으로 채움)."""
+    ids = list(room_ids)
+    counts = dict.fromkeys(ids, 0)
+    rows = (RoomMember.objects
+            .filter(room_id__in=ids, is_banned=False, open_conn__gt=0)
+            .values("room_id")
+            .annotate(n=Count("id"))
+            .values_list("room_id", "n"))
+    counts.update(rows)
+    return counts
+
+
+def _existing_rooms(room_ids: Iterable[int]) -> Dict[int, dict]:
+    """
+    플러시 대상 중 아직 존재하는 공개 방의 slug/정원 (삭제된 방은 room_closed/room_deleted가 처리).
+    비공개 방은 로비 스냅샷처럼 인원도 로비에 내보내지 않음.
+    """
+    return {
+        r["id"]: r
+        for r in (Room.objects.filter(id__in=list(room_ids), is_private=False)
+                  .values("id", "slug", "capacity", "topic"))
+    }
+
+
+def _collect(room_ids: Set[int]) -> list:
+    rooms = _existing_rooms(room_ids)
+    counts = room_occupancy(rooms.keys())
+
+    return [
+        {
+            "room_id": rid,
+            "room_slug": room["slug"],
+            "occupancy": counts.get(rid, 0),
+            "capacity": room["capacity"],
+            "topic": room["topic"],
+        }
+        for rid, room in rooms.items()
+    ]
+
+
+async def _flush_later():
+    global _flush_task
+    try:
+        await asyncio.sleep(OCCUPANCY_FLUSH_SECONDS)
+        ids = set(_dirty)
+        _dirty.clear()
+        if not ids:
+            return
+        changed = await sync_to_async(_collect)(ids)
+        if not changed:
+            return
+        # 전체 로비엔 한 번에, 주제 구독자에겐 자기 주제 방만
+        by_group = defaultdict(list)
+        for item in changed:
+            by_group[LOBBY_GROUP].append(item)
+            by_group[topic_group(item["topic"])].append(item)
+        layer = get_channel_layer()
+        for group, rooms in by_group.items():
+            await layer.group_send(group, lobby_event({"event": "occupancy", "rooms": rooms}))
+        logger.info("[단계] 로비 occupancy 브로드캐스트 rooms=%s", len(changed))
+    except Exception:
+        logger.exception("occupancy flush failed")
+    finally:
+        _flush_task = None
+        if _dirty:
+            _schedule()   # 플러시 도중 들어온 변경분은 다음 주기로
+
+
+def _schedule():
+    global _flush_task
+    if _flush_task is None:
+        _flush_task = asyncio.get_running_loop().create_task(_flush_later())
+
+
+def mark_dirty(room_id: int) -> None:
+    """
+    방 인원이 바뀌었을 수 있음을 표시(비동기 컨텍스트에서 호출).
+    이미 예약된 플러시가 있으면 거기에 합류 → 초당 최대 1회 로비 전송.
+    """
+    _dirty.add(room_id)
+    _schedule()
@@ -0,0 +1,157 @@
+# collab/outbox.py
+"""
+트랜잭셔널 아웃박스 — 뷰/모델/시그널에서 나가는 실시간 이벤트.
+1) publish(): 도메인 변경과 같은 트랜잭션 안에서 OutboxEvent 행만 INSERT (Redis 왕복 없음 → 요청이 빨리 끝남)
+2) 커밋되면 같은 프로세스의 디스패처를 깨움(call_soon_threadsafe), 다른 프로세스 행은 주기 폴링으로 수거
+3) 디스패처(이벤트 루프 태스크)가 id 순으로 배치 임대(SKIP LOCKED) → group_send → 성공분 삭제
+   실패하면 지수 백오프 후 재시도 → Redis가 잠깐 끊겨도 이벤트가 사라지지 않음
+ASGI 프로세스는 첫 요청(HTTP/WS) 때 OutboxDispatcherApp(config/asgi.py)이 ensure_dispatcher()로 시작
+→ HTTP만 받는 워커에서 쓴 이벤트도 그 프로세스가 바로 보냄.
+WSGI/관리 명령/셀러리 등 이벤트 루프가 없는 프로세스만 쓰는 배포라면 `manage.py outbox_dispatch --forever`를 반드시 함께 실행.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import frames
+from .models import OutboxEvent
+
+logger = logging.getLogger("collab")
+
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_POLL_SECONDS = 1.0        # 다른 프로세스가 쓴 행을 확인하는 주기
+OUTBOX_LEASE_SECONDS = 30        # 임대 시간(이 안에 못 보내면 다른 디스패처가 가져감)
+OUTBOX_MAX_BACKOFF = 60          # 재시도 간격 상한(초)
+
+# 프로세스(이벤트 루프) 단위 상태
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_wakeup: Optional[asyncio.Event] = None
+_task: Optional[asyncio.Task] = None
+
+
+# ──────────────────────────────────────────────────────────────
+# 쓰기 (요청 스레드)
+# ──────────────────────────────────────────────────────────────
+def publish(group: str, message: dict) -> None:
+    """이벤트 1건 기록(호출자의 트랜잭션에 포함). room.event/lobby.event는 payload만 넘기면 디스패처가 프레임 인코딩."""
+    OutboxEvent.objects.create(group=group, message=message)
+    transaction.on_commit(_notify)
+
+
+def publish_many(items: Iterable[Tuple[str, dict]]) -> None:
+    """여러 그룹/이벤트를 INSERT 1번으로 기록."""
+    rows = [OutboxEvent(group=g, message=m) for g, m in items]
+    if rows:
+        OutboxEvent.objects.bulk_create(rows)
+        transaction.on_commit(_notify)
+
+
+def _notify() -> None:
+    # 요청 스레드 → 이벤트 루프의 디스패처 깨우기(루프가 없으면 폴링이 처리)
+    loop, ev = _loop, _wakeup
+    if loop is not None and ev is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(ev.set)
+
+
+# ──────────────────────────────────────────────────────────────
+# 디스패처 (이벤트 루프)
+# ──────────────────────────────────────────────────────────────
+def _claim_batch(limit: int) -> list:
+    """보낼 차례인 행을 임대(다른 디스패처와 겹치지 않게 SKIP LOCKED)."""
+    close_old_connections()
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now)
+            .order_by("id")
+            .values_list("id", "group", "message", "attempts")[:limit]
+        )
+        if rows:
+            OutboxEvent.objects.filter(id__in=[r[0] for r in rows]).update(
+                available_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            )
+    return rows
+
+
+def _ack(sent_ids: list) -> None:
+    if sent_ids:
+        OutboxEvent.objects.filter(id__in=sent_ids).delete()
+
+
+def _retry_later(ids: list, attempts: int) -> None:
+    delay = min(OUTBOX_MAX_BACKOFF, 2 ** min(attempts, 6))
+    OutboxEvent.objects.filter(id__in=ids).update(
+        attempts=attempts + 1,
+        available_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+async def drain_once(limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """한 배치 전송. 반환: 보낸 건수."""
+    rows = await sync_to_async(_claim_batch)(limit)
+    if not rows:
+        return 0
+    layer = get_channel_layer()
+    sent = []
+    for i, (pk, group, message, attempts) in enumerate(rows):
+        try:
+            await layer.group_send(group, frames.prepare(message))
+        except Exception:
+            # 순서 유지를 위해 실패한 행부터 나머지는 통째로 다음 차례로
+            logger.warning("outbox 전송 실패 id=%s group=%s (재시도 %s회째)", pk, group, attempts + 1, exc_info=True)
+            await sync_to_async(_ack)(sent)
+            await sync_to_async(_retry_later)([r[0] for r in rows[i:]], attempts)
+            return len(sent)
+        sent.append(pk)
+    await sync_to_async(_ack)(sent)
+    return len(sent)
+
+
+async def _run():
+    global _task
+    try:
+        while True:
+            try:
+                n = await drain_once()
+            except Exception:
+                logger.exception("outbox drain failed")
+                n = 0
+            if n >= OUTBOX_BATCH_SIZE:
+                continue                        # 밀린 게 더 있으면 바로 다음 배치
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+    finally:
+        _task = None
+
+
+def ensure_dispatcher() -> None:
+    """현재 이벤트 루프에 디스패처가 없으면 시작(비동기 컨텍스트에서 호출, 여러 번 불러도 1개)."""
+    global _loop, _wakeup, _task
+    if _task is not None and not _task.done():
+        return
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    _task = _loop.create_task(_run())
+    logger.info("[단계] outbox 디스패처 시작")
+
+
+class OutboxDispatcherApp:
+    """ASGI 래퍼: 요청이 들어오면(이미 돌고 있으면 no-op) 이 프로세스의 디스패처를 보장."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            ensure_dispatcher()
+        return await self.inner(scope, receive, send)
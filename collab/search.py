@@ -0,0 +1,83 @@
+# collab/search.py
+"""
+방 목록/검색 공용 헬퍼 (home 뷰 + 로비 스냅샷).
+- 목록: id 기준 키셋 페이지네이션(`?before=<id>`) → OFFSET/COUNT 없이 PK 인덱스만 탐색
+- 필터: 주제 목록 / 빈 자리 있는 방만 (로비 WS 구독 필터와 동일 규칙)
+- 검색: MySQL이면 (Romname, topic) FULLTEXT ngram 인덱스로 MATCH ... AGAINST,
+        그 외 DB(개발용 sqlite 등)나 ngram 토큰보다 짧은 검색어는 icontains 폴백
+"""
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from .lobby import normalize_topic
+from .occupancy import occupancy_annotation
+
+ROOM_PAGE_SIZE = 30          # home 목록 한 페이지 / 로비 스냅샷 최대 방 개수
+NGRAM_TOKEN_SIZE = 2         # MySQL 기본 ngram_token_size (이보다 짧으면 인덱스로 못 찾음)
+
+# 0006 마이그레이션에서 만드는 FULLTEXT 인덱스와 컬럼 순서가 같아야 함
+_FULLTEXT_MATCH = "MATCH (`Romname`, `topic`) AGAINST (%s IN BOOLEAN MODE)"
+
+
+def _boolean_query(q: str) -> str:
+    """공백으로 나눈 단어를 모두 포함(+"단어")하는 BOOLEAN MODE 질의로 변환."""
+    words = [w.replace('"', "") for w in q.split()]
+    return " ".join(f'+"{w}"' for w in words if w)
+
+
+def _use_fulltext(q: str) -> bool:
+    if connection.vendor != "mysql":
+        return False
+    return all(len(w) >= NGRAM_TOKEN_SIZE for w in q.split())
+
+
+def search_rooms(qs, q: str):
+    """방 제목/주제 검색. 빈 검색어면 그대로 반환."""
+    q = (q or "").strip()
+    if not q:
+        return qs
+    if _use_fulltext(q):
+        return qs.annotate(
+            _ft=RawSQL(_FULLTEXT_MATCH, (_boolean_query(q),))
+        ).filter(_ft__gt=0)
+    return qs.filter(Q(Romname__icontains=q) | Q(topic__icontains=q))
+
+
+def filter_rooms(qs, *, topics=None, only_free: bool = False):
+    """로비 필터: 주제 목록(topic_group과 같은 정규화: 공백 제거/소문자/50자) / 빈 자리 있는 방만."""
+    topics = {normalize_topic(t) for t in (topics or ())} - {""}
+    if topics:
+        cond = Q()
+        for t in topics:
+            cond |= Q(topic__iexact=t)
+        qs = qs.filter(cond)
+    if only_free:
+        if "occupancy" not in qs.query.annotations:
+            qs = qs.annotate(occupancy=occupancy_annotation())
+        qs = qs.filter(occupancy__lt=F("capacity"))
+    return qs
+
+
+def parse_cursor(raw) -> int | None:
+    """`before` 쿼리스트링 → 정수 id (잘못된 값이면 첫 페이지)."""
+    try:
+        v = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return v if v > 0 else None
+
+
+def room_page(qs, *, before: int | None = None, limit: int = ROOM_PAGE_SIZE):
+    """
+    최신순 키셋 페이지.
+    반환: (rooms 리스트, next_cursor) — 다음 페이지가 없으면 next_cursor=None
+    """
+    qs = qs.order_by("-id")
+    if before:
+        qs = qs.filter(id__lt=before)
+    rows = list(qs[:limit + 1])            # 1개 더 읽어서 다음 페이지 유무 판단(COUNT 불필요)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].id if (has_more and rows) else None
+    return rows, next_cursor
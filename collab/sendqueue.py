@@ -0,0 +1,163 @@
+# collab/sendqueue.py
+"""
+접속(WS)별 송신 큐 — 느린 클라이언트 하나가 방 전체를 끌어내리지 않도록.
+- 모든 서버→클라 프레임은 큐에 넣고, 전용 태스크가 소켓에 씀
+- 우선순위(레인과 같은 순서): 제어(강퇴/방 삭제/방장 변경/입장·퇴장/캐러셀 …) → chat → draw.*
+  각 단계 안에서는 FIFO(draw.clear와 붓질 순서 유지), 밀린 붓질이 있어도 새 제어 프레임이 먼저 나감
+- 큐가 예산(바이트/프레임 수)을 넘으면:
+    · image.goto  → 가장 최근 것만 남기고 이전 것 폐기(어차피 마지막 위치만 의미 있음)
+    · draw.stroke → 폐기 + "resync 필요" 표시(큐가 비면 클라에 resync 알림 → 스냅샷 다시 요청)
+    · chat/제어 프레임 → 절대 버리지 않음
+- 그래도 하드 한도(예산 × HARD_LIMIT_FACTOR)를 넘으면 연결을 끊음(재접속 시 스냅샷으로 복구)
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger("collab")
+
+SEND_QUEUE_MAX_BYTES = 256 * 1024
+SEND_QUEUE_MAX_FRAMES = 200
+HARD_LIMIT_FACTOR = 4
+
+DROPPABLE = {"draw.stroke"}       # 버리면 resync로 복구
+COALESCE = {"image.goto"}         # 최신 것만 유지
+PRIORITIES = 3                    # priority_of() 반환 범위
+
+
+class QueueOverflow(Exception):
+    """제어/채팅 프레임만으로 하드 한도를 넘음(클라이언트가 사실상 멈춤)."""
+
+
+class _Item:
+    __slots__ = ("text", "data", "kind", "size", "dropped")
+
+    def __init__(self, text, data, kind):
+        self.text = text
+        self.data = data
+        self.kind = kind
+        self.size = len(text) if text is not None else len(data or b"")
+        self.dropped = False
+
+
+def priority_of(kind: Optional[str]) -> int:
+    """lanes.py 레인 순서와 같게: 제어(0) → chat(1) → draw.*(2)."""
+    if kind == "chat":
+        return 1
+    if kind and kind.startswith("draw."):
+        return 2
+    return 0
+
+
+class SendQueue:
+    def __init__(self, write: Callable[[Optional[str], Optional[bytes]], Awaitable[None]],
+                 on_resync: Callable[[], Awaitable[None]], *,
+                 max_bytes: int = SEND_QUEUE_MAX_BYTES, max_frames: int = SEND_QUEUE_MAX_FRAMES):
+        self._write = write
+        self._on_resync = on_resync
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self._queues = [deque() for _ in range(PRIORITIES)]   # 우선순위별 FIFO
+        self._count = 0
+        self._bytes = 0
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._control_idle = asyncio.Event()     # 제어 프레임이 전부 소켓에 써졌음
+        self._control_idle.set()
+        self.needs_resync = False
+        self.dropped = 0
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, text: Optional[str] = None, data: Optional[bytes] = None, kind: Optional[str] = None) -> None:
+        item = _Item(text, data, kind)
+        prio = priority_of(kind)
+        if kind in COALESCE:
+            for old in self._queues[prio]:       # 같은 종류의 대기 중 프레임은 새 것으로 대체
+                if old.kind == kind and not old.dropped:
+                    self._drop(old)
+            self._compact(prio)
+        self._queues[prio].append(item)
+        self._count += 1
+        self._bytes += item.size
+        if prio == 0:
+            self._control_idle.clear()
+        if self._over(1):
+            self._shed()
+            if self._over(HARD_LIMIT_FACTOR):
+                raise QueueOverflow(f"send queue {self._count} frames / {self._bytes} bytes")
+        self._idle.clear()
+        self._ready.set()
+
+    def _over(self, factor: int) -> bool:
+        return self._bytes > self.max_bytes * factor or self._count > self.max_frames * factor
+
+    def _drop(self, item: _Item) -> None:
+        item.dropped = True
+        self._count -= 1
+        self._bytes -= item.size
+        self.dropped += 1
+
+    def _compact(self, prio: int) -> None:
+        queue = self._queues[prio]
+        if any(i.dropped for i in queue):
+            self._queues[prio] = deque(i for i in queue if not i.dropped)
+
+    def _shed(self) -> None:
+        """예산 초과: 버려도 되는 프레임부터 정리(오래된 것부터)."""
+        for prio, queue in enumerate(self._queues):
+            for item in queue:
+                if not self._over(1):
+                    break
+                if item.kind in DROPPABLE and not item.dropped:
+                    self._drop(item)
+                    self.needs_resync = True
+            self._compact(prio)
+
+    def _pop(self) -> Optional[_Item]:
+        for queue in self._queues:
+            while queue:
+                item = queue.popleft()
+                if not item.dropped:
+                    return item
+        return None
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            while True:
+                item = self._pop()                  # 매번 가장 높은 우선순위부터 → 새 제어 프레임이 밀린 붓질을 앞지름
+                if item is None:
+                    break
+                self._count -= 1
+                self._bytes -= item.size
+                try:
+                    await self._write(item.text, item.data)
+                except Exception:
+                    logger.debug("send queue write failed", exc_info=True)
+                if not self._queues[0]:
+                    self._control_idle.set()
+            self._control_idle.set()
+            self._ready.clear()
+            if self.needs_resync:
+                self.needs_resync = False
+                try:
+                    await self._on_resync()
+                except Exception:
+                    logger.debug("resync notice failed", exc_info=True)
+            if not self._count:
+                self._idle.set()
+
+    async def drain(self, timeout: float = 2.0, *, control_only: bool = False) -> None:
+        """
+        대기 중인 프레임을 다 보낼 때까지(최대 timeout초) 기다림.
+        control_only=True: 제어 프레임(강퇴/방 삭제 안내 등)만 — close 직전에 밀린 붓질/채팅을 기다리지 않음.
+        """
+        try:
+            await asyncio.wait_for((self._control_idle if control_only else self._idle).wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        self._task.cancel()
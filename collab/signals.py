@@ -2,33 +2,67 @@ import logging
 from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.db import transaction
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
-from .models import Room
+from .models import Room, Message, ImageBlob
+from .image_pipeline import delete_variants
+from .media_gc import delete_later
+from .lobby import lobby_groups, topic_group
+from . import outbox
 from logui import log_step
 
 logger = logging.getLogger("lobby")  # ✅ 앱 이름 맞게 로거 생성
 
 
-def _broadcast(payload:dict):
-    async_to_sync(get_channel_layer().group_send)(
-        "lobby",
-        {"type": "lobby.event", "payload": payload}
-    )
-    log_step(logger, "로비 이벤트 브로드캐스트", "_broadcast", {"payload": payload})
+def _broadcast(payload:dict, topic=None, groups=None):
+    """전체 로비(lobby) + 해당 주제 그룹(lobby_topic_<t>)에만 전송(저장과 같은 트랜잭션의 아웃박스로)."""
+    message = {"type": "lobby.event", "payload": payload}
+    outbox.publish_many((group, message) for group in (groups or lobby_groups(topic)))
+    log_step(logger, "로비 이벤트 브로드캐스트", "_broadcast", {"payload": payload, "topic": topic})
+
+def _lobby_diff(instance: Room, changes: dict) -> dict:
+    """바뀐 로비 필드 → 로비 이벤트 키(home.js가 읽는 이름). 비밀번호 값은 절대 내보내지 않음."""
+    out = {}
+    if "Romname" in changes:
+        out["name"] = instance.Romname
+    if "topic" in changes:
+        out["topic"] = instance.topic
+    if "is_private" in changes:
+        out["is_private"] = instance.is_private
+    if "capacity" in changes:
+        out["capacity"] = instance.capacity
+    if "password" in changes:
+        out["locked"] = instance.requires_password
+    if "created_by_id" in changes:
+        owner = instance.created_by
+        out["owner_id"] = owner.pk
+        out["owner"] = getattr(owner, "display_name", None) or owner.username
+    return out
+
 
 @receiver(post_save, sender=Room)
-def on_room_save(sender, instance: Room, created:bool, **kwargs):
-    def _after_commit():
-        if created:
-            _broadcast({"event": "room_created", "room_slug": instance.slug,"room_id": instance.id,"ceated_at": instance.created_at.isoformat(),"topic": instance.topic})
-            log_step(logger, "로비 이벤트 브로드캐스트", "방생성", {"event": "room_created", "room_slug": instance.slug,"room_id": instance.id})
-        else:
-            _broadcast({"event": "room_updated", "room_slug": instance.slug})
-            log_step(logger, "로비 이벤트 브로드캐스트", "방수정", {"event": "room_updated", "room_slug": instance.slug})
+def on_room_save(sender, instance: Room, created:bool, update_fields=None, **kwargs):
+    topic = instance.topic
+    prev_topic = getattr(instance, "_lobby_loaded", {}).get("topic", topic)
+    changes = {} if created else instance.lobby_changes(update_fields)
+    instance.snapshot_lobby_fields()   # 같은 인스턴스로 다시 저장할 때 기준값 갱신
 
-    transaction.on_commit(_after_commit)
+    if not created and not changes:
+        # updated_at/last_active 같은 내부 저장 → 로비에 보일 변화 없음: 전송 생략
+        log_step(logger, "로비 이벤트 생략", "변경 없음", {"room_slug": instance.slug, "update_fields": sorted(update_fields or [])})
+        return
+
+    # 아웃박스 행을 저장과 같은 트랜잭션에 기록(전송은 커밋 후 디스패처가) → 커밋되면 이벤트도 반드시 나감
+    if created:
+        _broadcast({"event": "room_created", "room_slug": instance.slug,"room_id": instance.id,"ceated_at": instance.created_at.isoformat(),"topic": topic}, topic)
+        log_step(logger, "로비 이벤트 브로드캐스트", "방생성", {"event": "room_created", "room_slug": instance.slug,"room_id": instance.id})
+    else:
+        diff = _lobby_diff(instance, changes)
+        _broadcast({"event": "room_updated", "room_slug": instance.slug, "room_id": instance.id, **diff}, topic)
+        if topic_group(prev_topic) != topic_group(topic):
+            # 주제가 바뀌면 이전 주제 구독자 목록에서는 빠져야 함
+            _broadcast({"event": "room_hidden", "room_slug": instance.slug, "room_id": instance.id},
+                       groups=[topic_group(prev_topic)])
+        log_step(logger, "로비 이벤트 브로드캐스트", "방수정", {"event": "room_updated", "room_slug": instance.slug, "fields": sorted(diff)})
 
 @receiver(pre_delete, sender=Room)
 def on_room_pre_delete(sender, instance: Room, **kwargs):
@@ -37,8 +71,24 @@ def on_room_pre_delete(sender, instance: Room, **kwargs):
 
 @receiver(post_delete, sender=Room)
 def on_room_delete(sender, instance: Room, **kwargs):
-    def _after_commit():
-        _broadcast({"event": "room_deleted", "room_slug": instance.slug,"room_id": instance._deleted_id})
-        log_step(logger, "로비 이벤트 브로드캐스트", "방삭제", {"event": "room_deleted", "room_slug": instance.slug,"room_id": instance.id})
+    _broadcast({"event": "room_deleted", "room_slug": instance.slug,"room_id": instance._deleted_id}, instance.topic)
+    log_step(logger, "로비 이벤트 브로드캐스트", "방삭제", {"event": "room_deleted", "room_slug": instance.slug,"room_id": instance._deleted_id})
+
+
+# ──────────────────────────────────────────────────────────────
+# 이미지 블롭 참조 카운트: 메시지 생성 +1 / 삭제 -1 (방 삭제 CASCADE 포함)
+# ──────────────────────────────────────────────────────────────
+@receiver(post_save, sender=Message)
+def on_message_save(sender, instance: Message, created: bool, **kwargs):
+    if created and instance.image:
+        ImageBlob.acquire(instance.image.name)
+
+
+@receiver(post_delete, sender=Message)
+def on_message_delete(sender, instance: Message, **kwargs):
+    if not instance.image:
+        return
+    ImageBlob.release(instance.image.name)           # 마지막 참조일 때만 파일 삭제(커밋 후)
+    message_id = instance.pk
+    transaction.on_commit(lambda: delete_later(delete_variants, message_id))
 
-    transaction.on_commit(_after_commit)
\ No newline at end of file
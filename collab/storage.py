@@ -0,0 +1,74 @@
+# collab/storage.py
+"""
+방 이미지용 내용 주소(content-addressed) 저장소.
+- 업로드 스트림을 청크 단위로 임시 파일에 쓰면서 동시에 SHA-256 계산(메모리에 통째로 올리지 않음)
+- 최종 경로 = room_images/cas/<앞 2글자>/<digest><확장자> → 같은 사진은 디스크에 1벌만
+- 참조 수는 ImageBlob 테이블이 관리(삭제는 마지막 참조가 사라질 때만, collab/signals.py)
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+CAS_PREFIX = "room_images/cas"
+UPLOAD_SESSION_TTL = 60 * 60                 # 청크 업로드 세션 유효 시간(초)
+
+
+def upload_temp_dir() -> str:
+    """청크 업로드 임시 파일 폴더(MEDIA_ROOT 밖 → 미완성 파일이 서빙/GC 대상에 섞이지 않음)."""
+    base = settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir()
+    path = os.path.join(base, "codingline-uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cas_name(digest: str, ext: str) -> str:
+    return f"{CAS_PREFIX}/{digest[:2]}/{digest}{ext.lower()}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # 이름은 _save에서 내용 해시로 정해지므로 -xyz 접미사 붙이기(중복 회피)는 하지 않음
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1][:10]
+        tmp_dir = self.path(CAS_PREFIX)
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        h = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    h.update(chunk)
+                    out.write(chunk)
+
+            final = cas_name(h.hexdigest(), ext)
+            final_path = self.path(final)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            # 이미 있는 내용이어도 원자적 교체(rename) → 동시 삭제와 겹쳐도 방금 올린 파일은 항상 존재
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return final
+
+
+_storage = None
+
+
+def get_image_storage():
+    """Message.image에서 쓰는 저장소(모델 필드 storage=에 콜러블로 연결 → 마이그레이션 안정)."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
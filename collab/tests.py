@@ -1,3 +1,251 @@
-from django.test import TestCase
+import asyncio
+import uuid
+from concurrent.futures import Future
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import carousel, image_pipeline, occupancy, outbox
+from .models import Message, OutboxEvent, Room, RoomMember
+from .sendqueue import QueueOverflow, SendQueue
+
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# ──────────────────────────────────────────────────────────────
+# 아웃박스: 저장과 같은 트랜잭션에 기록 / 커밋 후 전송
+# ──────────────────────────────────────────────────────────────
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER, CACHES=LOCMEM_CACHE)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="owner", password="pw-12345678")
+
+    def test_publish_rolls_back_with_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                outbox.publish("room_1", {"type": "room.event", "payload": {"event": "x"}})
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_room_save_writes_lobby_rows_in_same_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Room.objects.create(Romname="롤백될 방", created_by=self.user)
+                self.assertTrue(OutboxEvent.objects.filter(message__payload__event="room_created").exists())
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+        Room.objects.create(Romname="남을 방", topic="django", created_by=self.user)
+        groups = set(OutboxEvent.objects.values_list("group", flat=True))
+        self.assertEqual(groups, {"lobby", "lobby_topic_django"})
+
+    async def test_drain_once_sends_and_deletes(self):
+        await OutboxEvent.objects.acreate(group="lobby", message={"type": "lobby.event", "payload": {"event": "x"}})
+        layer = outbox.get_channel_layer()
+        channel = await layer.new_channel()
+        await layer.group_add("lobby", channel)
+
+        self.assertEqual(await outbox.drain_once(), 1)
+        msg = await layer.receive(channel)
+        self.assertEqual(msg["type"], "lobby.event")
+        self.assertIn("frame", msg)
+        self.assertFalse(await OutboxEvent.objects.aexists())
+
+    async def test_drain_once_keeps_rows_on_send_failure(self):
+        await OutboxEvent.objects.acreate(group="lobby", message={"type": "lobby.event", "payload": {"event": "x"}})
+        layer = outbox.get_channel_layer()
+        with mock.patch.object(layer, "group_send", side_effect=ConnectionError):
+            self.assertEqual(await outbox.drain_once(), 0)
+        row = await OutboxEvent.objects.aget()
+        self.assertEqual(row.attempts, 1)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER, CACHES=LOCMEM_CACHE)
+@mock.patch("collab.image_pipeline.close_old_connections", lambda: None)
+@mock.patch("collab.image_pipeline.connection")        # 파이프라인 스레드용 close()가 테스트 커넥션을 닫지 않도록
+class ImageReadyOutboxTests(TestCase):
+    RESULT = {"width": 640, "height": 480, "variants": {
+        "thumb": {"width": 320, "height": 240, "files": {"webp": "thumb.webp"}},
+    }}
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="owner", password="pw-12345678")
+        self.room = Room.objects.create(Romname="방", created_by=user)
+        self.msg = Message.objects.create(room=self.room, user=user, content="x")
+        OutboxEvent.objects.all().delete()
+
+    def _done(self):
+        fut = Future()
+        fut.set_result(self.RESULT)
+        return fut
+
+    def test_variants_update_and_image_ready_row_together(self, _conn):
+        image_pipeline._finish(self.msg.id, self._done())
+        self.msg.refresh_from_db()
+        self.assertEqual((self.msg.image_width, self.msg.image_height), (640, 480))
+        row = OutboxEvent.objects.get()
+        self.assertEqual(row.group, f"room_{self.room.id}")
+        self.assertEqual(row.message["type"], "image.ready")
+        self.assertEqual(row.message["message_id"], self.msg.id)
+        self.assertIn("thumb", row.message["variants"])
+
+    def test_deleted_message_writes_no_event(self, _conn):
+        msg_id = self.msg.id
+        self.msg.delete()
+        with mock.patch("collab.image_pipeline.delete_variants") as delete_variants:
+            image_pipeline._finish(msg_id, self._done())
+        delete_variants.assert_called_once_with(msg_id)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+# ──────────────────────────────────────────────────────────────
+# 로비 occupancy 집계
+# ──────────────────────────────────────────────────────────────
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER, CACHES=LOCMEM_CACHE)
+class OccupancyCollectTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username="owner", password="pw-12345678")
+        self.public = Room.objects.create(Romname="공개", created_by=self.owner)
+        self.private = Room.objects.create(Romname="비공개", created_by=self.owner, is_private=True)
+        for room in (self.public, self.private):
+            RoomMember.objects.create(room=room, user=self.owner, open_conn=1)
+
+    def test_private_rooms_are_not_reported(self):
+        rooms = occupancy._collect({self.public.id, self.private.id})
+        self.assertEqual([r["room_id"] for r in rooms], [self.public.id])
+        self.assertEqual(rooms[0]["occupancy"], 1)
+
+    def test_unchanged_count_is_sent_again(self):
+        # 다른 프로세스가 그 사이 다른 값을 보냈을 수 있으므로 같은 값도 다시 보냄
+        first = occupancy._collect({self.public.id})
+        again = occupancy._collect({self.public.id})
+        self.assertEqual(first, again)
+        self.assertEqual(len(again), 1)
+
+
+# ──────────────────────────────────────────────────────────────
+# 접속별 송신 큐
+# ──────────────────────────────────────────────────────────────
+class SendQueueTests(SimpleTestCase):
+    def _queue(self, **kw):
+        self.sent, self.resyncs = [], 0
+
+        async def write(text, data):
+            self.sent.append(text)
+
+        async def on_resync():
+            self.resyncs += 1
+
+        return SendQueue(write, on_resync, **kw)
+
+    async def test_image_goto_keeps_latest_only(self):
+        q = self._queue()
+        for i in range(3):
+            q.put(text=f"goto{i}", kind="image.goto")
+        q.put(text="chat", kind="chat")
+        await q.drain()
+        q.stop()
+        self.assertEqual(self.sent, ["goto2", "chat"])
+
+    async def test_strokes_dropped_over_budget_then_resync(self):
+        q = self._queue(max_frames=3)
+        q.put(text="chat0", kind="chat")
+        for i in range(5):
+            q.put(text=f"s{i}", kind="draw.stroke")
+        await q.drain()
+        q.stop()
+        self.assertIn("chat0", self.sent)
+        self.assertLessEqual(len(self.sent), 3)
+        self.assertGreater(q.dropped, 0)
+        self.assertEqual(self.resyncs, 1)
+
+    async def test_control_frames_go_ahead_of_pending_strokes(self):
+        q = self._queue()
+        q.put(text="s0", kind="draw.stroke")
+        q.put(text="clear", kind="draw.clear")
+        q.put(text="s1", kind="draw.stroke")
+        q.put(text="chat", kind="chat")
+        q.put(text="kicked", kind="kicked")
+        await q.drain()
+        q.stop()
+        # 제어 → chat → draw(draw 안에서는 도착 순서 그대로: clear 앞뒤 붓질이 섞이지 않음)
+        self.assertEqual(self.sent, ["kicked", "chat", "s0", "clear", "s1"])
+
+    async def test_control_only_drain_does_not_wait_for_strokes(self):
+        q = self._queue()
+
+        async def slow_write(text, data):
+            await asyncio.sleep(0.05)
+            self.sent.append(text)
+        q._write = slow_write
+        for i in range(20):
+            q.put(text=f"s{i}", kind="draw.stroke")
+        q.put(text="room_closed", kind="room_closed")
+        await q.drain(timeout=1.0, control_only=True)
+        self.assertEqual(self.sent, ["room_closed"])
+        q.stop()
+
+    async def test_chat_is_never_dropped_but_overflows(self):
+        q = self._queue(max_frames=2)
+        with self.assertRaises(QueueOverflow):
+            for i in range(20):
+                q.put(text=f"c{i}", kind="chat")
+        self.assertEqual(q.dropped, 0)
+        q.stop()
+
+
+# ──────────────────────────────────────────────────────────────
+# 캐러셀 비교 후 설정(CAS) — Redis 필요(없으면 건너뜀)
+# ──────────────────────────────────────────────────────────────
+def _redis_available() -> bool:
+    try:
+        import redis
+        redis.Redis.from_url(settings.CACHES["default"]["LOCATION"], socket_connect_timeout=0.5).ping()
+        return True
+    except Exception:
+        return False
+
+
+class CarouselCASTests(SimpleTestCase):
+    def setUp(self):
+        if not _redis_available():
+            self.skipTest("Redis 없음")
+        self.room_id = f"test-{uuid.uuid4().hex}"
+
+    async def _cleanup(self):
+        await carousel._redis().delete(carousel.CAROUSEL_KEY.format(room_id=self.room_id))
+
+    async def test_compare_and_set(self):
+        try:
+            self.assertIsNone(await carousel.get_state(self.room_id))
+
+            applied, state = await carousel.compare_and_set(self.room_id, 0, "img-a", 0)
+            self.assertTrue(applied)
+            self.assertEqual(state, {"image_id": "img-a", "idx": 0, "version": 1})
+
+            # 같은 version을 보고 보낸 늦은 요청은 거절되고 현재 상태를 돌려받음
+            applied, state = await carousel.compare_and_set(self.room_id, 0, "img-b", 1)
+            self.assertFalse(applied)
+            self.assertEqual(state, {"image_id": "img-a", "idx": 0, "version": 1})
+
+            applied, state = await carousel.compare_and_set(self.room_id, 1, "img-b", 1)
+            self.assertTrue(applied)
+            self.assertEqual(await carousel.get_state(self.room_id), state)
+            self.assertEqual(state["version"], 2)
+        finally:
+            await self._cleanup()
+
+    async def test_concurrent_moves_apply_once(self):
+        try:
+            results = await asyncio.gather(*(
+                carousel.compare_and_set(self.room_id, 0, f"img-{i}", i) for i in range(5)
+            ))
+            self.assertEqual(sum(applied for applied, _ in results), 1)
+            self.assertEqual((await carousel.get_state(self.room_id))["version"], 1)
+        finally:
+            await self._cleanup()
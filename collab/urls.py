@@ -22,4 +22,9 @@ urlpatterns = [
     path('rooms/<str:slug>/messages/', views.api_messages_list, name='api_messages_list'),           # GET: 최근 메시지
     path('rooms/<str:slug>/images/upload/', views.api_image_upload, name='api_image_upload'),        # POST: 이미지 업로드(다중)
     path('rooms/<str:slug>/images/<int:message_id>/delete/', views.api_image_delete, name='api_image_delete'),  # POST: 이미지 삭제
+
+    # 청크 업로드(재개 가능): 시작 → 청크 PUT(offset) → 완료
+    path('rooms/<str:slug>/uploads/', views.api_upload_init, name='api_upload_init'),                           # POST: 세션 시작
+    path('rooms/<str:slug>/uploads/<str:upload_id>/', views.api_upload_chunk, name='api_upload_chunk'),         # GET: offset / PUT: 청크
+    path('rooms/<str:slug>/uploads/<str:upload_id>/finalize/', views.api_upload_finalize, name='api_upload_finalize'),  # POST: 완료
 ]
@@ -2,27 +2,44 @@
 # imports
 # ------------------------------------------------------------
 from __future__ import annotations
+import json
+import os
+import re
 import time
+import uuid
+from collections import defaultdict
 
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
 from django.db import transaction
 from django.forms import ValidationError
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST, require_http_methods   # ← GET/POST 한정 데코레이터
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator                                 # ← 페이지네이션
 
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from .forms import RoomCreateForm
-from .models import Room, RoomMember, Message     
+from .models import Room, RoomMember, Message, ImageBlob
+from .search import search_rooms, filter_rooms, room_page, parse_cursor
+from .lobby import lobby_groups, parse_topics
+from . import outbox
+from .codec import JsonResponse     # django.http.JsonResponse와 같은 인자, orjson/msgspec 사용
+from accounts.ws_auth import issue_ws_token
+from config.db_router import replica_reads, replica_view
+from .image_pipeline import enqueue_image_processing
+from .imaging import detect_upload_ext
+from .history import message_page
+from .storage import upload_temp_dir, UPLOAD_SESSION_TTL
 from django.db import transaction
 
 import logging
@@ -67,13 +84,20 @@ def safe_group_send(group: str, message: dict) -> None:
 # ------------------------------------------------------------
 # 기본 뷰들
 # ------------------------------------------------------------
+@replica_view
 def home(request):
-    """메인 화면: 검색 + 방 생성"""
+    """메인 화면: 검색 + 방 생성 (목록은 키셋 페이지네이션: ?before=<id>)"""
     q = request.GET.get("q", "").strip()
-    rooms = Room.objects.all().order_by("-created_at")
+    before = parse_cursor(request.GET.get("before"))
+    topics = parse_topics(request.GET.get("topics"))      # 로비 WS 구독 필터와 동일
+    only_free = request.GET.get("free") in ("1", "true")
+    qs = Room.objects.select_related("created_by")
     if q:
-        from django.db.models import Q
-        rooms = rooms.filter(Q(Romname__icontains=q) | Q(topic__icontains=q))
+        qs = search_rooms(qs, q)                 # MySQL: FULLTEXT ngram / 그 외: icontains
+    else:
+        qs = qs.filter(is_private=False)         # 비공개 방은 검색으로만 노출
+    qs = filter_rooms(qs, topics=topics, only_free=only_free)
+    rooms, next_cursor = room_page(qs, before=before)
 
     if request.method == "POST":
         if not request.user.is_authenticated:
@@ -92,7 +116,13 @@ def home(request):
     else:
         form = RoomCreateForm()
 
-    return render(request, "collab/home.html", {"form": form, "rooms": rooms, "q": q})
+    return render(request, "collab/home.html", {
+        "form": form,
+        "rooms": rooms,
+        "q": q,
+        "next_cursor": next_cursor,
+        "live_list": not q and not before,   # 첫 페이지(검색 X)만 로비 스냅샷으로 갱신
+    })
 
 @login_required
 @require_http_methods(["GET"])
@@ -161,31 +191,25 @@ def room_leave(request, slug):
         if _is_owner(user, room):
             new_owner = room.transfer_ownership_to_earliest()
             if new_owner:
-                new_owner_payload = {
-                    "type": "room.event",
-                    "payload": {
-                        "event": "owner_changed",
-                        "room_id": room_id,
-                        "new_owner_id": new_owner.user_id,
-                        "new_owner_name": getattr(new_owner.user, "username", str(new_owner.user_id)),
-                        "version": int(time.time() * 1000),
-                    },
-                }
+                new_owner_payload = {"type": "room.event", "payload": {
+                    "event": "owner_changed",
+                    "room_id": room_id,
+                    "new_owner_id": new_owner.user_id,
+                    "new_owner_name": getattr(new_owner.user, "username", str(new_owner.user_id)),
+                    "version": int(time.time() * 1000),
+                }}
 
         # 2) 내 멤버십 삭제
         RoomMember.objects.filter(room=room, user=user).delete()
 
         # 3) 나감 알림 준비
-        user_left_payload = {
-            "type": "room.event",
-            "payload": {
-                "event": "user_left",
-                "room_id": room_id,
-                "user_id": user.id,
-                "username": getattr(user, "username", str(user.id)),
-                "version": int(time.time() * 1000),
-            },
-        }
+        user_left_payload = {"type": "room.event", "payload": {
+            "event": "user_left",
+            "room_id": room_id,
+            "user_id": user.id,
+            "username": getattr(user, "username", str(user.id)),
+            "version": int(time.time() * 1000),
+        }}
 
         # 4) 방이 비었으면 방 삭제 + room_closed 알림 예약
         has_active = (
@@ -202,19 +226,21 @@ def room_leave(request, slug):
                 group_room,
                 {"type": "room.closed", "msg": "방이 삭제되었습니다.", "slug": room_slug},
             ))
-            room_closed_payloads.append((
-                "lobby",
-                {"type": "lobby.event",
-                 "payload": {"event": "room_closed", "room_id": room_id, "slug": room_slug}},
-            ))
-
-    # ── 트랜잭션 밖: 커밋 성공 후에만 브로드캐스트 ──
-    if new_owner_payload:
-        safe_group_send(group_room, new_owner_payload)
-    if user_left_payload:
-        safe_group_send(group_room, user_left_payload)
-    for g, msg in room_closed_payloads:
-        safe_group_send(g, msg)
+            for lobby_group in lobby_groups(room.topic):
+                room_closed_payloads.append((
+                    lobby_group,
+                    {"type": "lobby.event",
+                     "payload": {"event": "room_closed", "room_id": room_id, "slug": room_slug}},
+                ))
+
+        # 5) 같은 트랜잭션에 아웃박스 기록(INSERT 1번) → 커밋 후 디스패처가 순서대로 전송
+        events = []
+        if new_owner_payload:
+            events.append((group_room, new_owner_payload))
+        if user_left_payload:
+            events.append((group_room, user_left_payload))
+        events.extend(room_closed_payloads)
+        outbox.publish_many(events)
 
     logger.info("방 나감: user=%s, room=%s", user.pk, room_id)
     return redirect("home")
@@ -239,11 +265,11 @@ def api_kick(request, slug, user_id):
         
         logger.info(f"강퇴: by={request.user.pk}, target={target.pk}, room={room.pk}")
         
-        # 트랜잭션이 커밋된 후 비동기 작업 처리
-        transaction.on_commit(lambda: safe_group_send(
+        # 강퇴와 같은 트랜잭션에 아웃박스 기록 → 커밋 후 디스패처가 전송
+        outbox.publish(
             f"room_{room.pk}_user_{target.pk}",
             {"type": "kicked", "msg": "방장에 의해 강퇴되었습니다."}
-        ))
+        )
 
         if is_ajax:
             # AJAX 요청 시 JSON 응답으로 메시지 반환
@@ -303,7 +329,7 @@ def room_detail(request, slug):
     # 2) (선택) 방장이면 세션 접근 허용
     if _is_owner(request.user, room):
         _grant_session_access(request, room)
-        return render(request, "collab/room_detail.html", {"room": room})
+        return render(request, "collab/room_detail.html", _room_detail_context(request, room))
 
     # 3) 비번 방이면 세션 키 없을 때 차단
     if room.requires_password and not request.session.get(_session_key(room.pk)):
@@ -316,7 +342,12 @@ def room_detail(request, slug):
         mem.last_active_at = timezone.now()
         mem.save(update_fields=["last_active_at"])
 
-    return render(request, "collab/room_detail.html", {"room": room})
+    return render(request, "collab/room_detail.html", _room_detail_context(request, room))
+
+
+def _room_detail_context(request, room):
+    # WS 접속 토큰: 소켓 연결 때 세션/유저 DB 조회를 건너뜀(accounts/ws_auth.py)
+    return {"room": room, "ws_token": issue_ws_token(request.user, room.slug)}
 
 
 # ------------------------------------------------------------
@@ -343,25 +374,9 @@ def api_messages_list(request, slug):
         return JsonResponse({"ok": False, "error": reason}, status=403)
 
     page = int(request.GET.get("page", 1))
-    qs = Message.objects.filter(room=room).select_related("user")
-    p = Paginator(qs, 50)                         # 페이지당 50개
-    page_obj = p.get_page(page)
-
-    def _s(m: Message):
-        return {
-            "id": m.id,
-            "user": getattr(m.user, "username", str(m.user_id)),
-            "content": m.content,
-            "image_url": (m.image.url if m.image else None),
-            "ts": m.created_at.isoformat(),
-        }
-
-    return JsonResponse({
-        "ok": True,
-        "page": page_obj.number,
-        "num_pages": p.num_pages,
-        "results": [_s(m) for m in page_obj.object_list],
-    })
+    with replica_reads():                         # 권한 검사는 primary, 메시지 목록만 복제본
+        data = message_page(room.id, page)        # 페이지당 50개(collab/history.py)
+    return JsonResponse({"ok": True, **data})
 
 
 @require_POST
@@ -369,6 +384,7 @@ def api_messages_list(request, slug):
 def api_image_upload(request, slug):
     """
     다중 이미지 업로드 → Message 생성 → 방 그룹에 image 이벤트 브로드캐스트.
+    리사이즈 변형본은 백그라운드에서 만들고 끝나면 `image.ready`로 다시 알림(image_pipeline).
     요청: form-data로 images 여러 개
     응답: {"ok":true,"count":N,"ids":[...]}
     """
@@ -381,23 +397,252 @@ def api_image_upload(request, slug):
     files = request.FILES.getlist("images")
     if not files:
         return JsonResponse({"ok": False, "error": "업로드할 파일이 없습니다."}, status=400)
+    for f in files:
+        ext = detect_upload_ext(f)
+        if ext is None:
+            return JsonResponse({"ok": False, "error": f"이미지 파일이 아닙니다: {f.name}"}, status=400)
+        f.name = _image_name(f.name, ext)
+
+    created = _create_image_messages(room, request.user, files)
+    return JsonResponse({"ok": True, "count": len(created), "ids": [m.id for m in created]})
+
 
-    created = []
+def _create_image_messages(room: Room, user, files) -> list[Message]:
+    """
+    N장 업로드를 한 번에: 파일 저장(트랜잭션 밖) → bulk_create 1회 + 블롭 참조 일괄 +1 → 커밋 후 `image.batch` 1회 전송.
+    (N번 create + N번 group_send 대신 DB 왕복 몇 번 + 팬아웃 1회, 장 수와 무관)
+    """
+    started = timezone.now()
+    msgs = []
     for f in files:
-        m = Message.objects.create(room=room, user=request.user, image=f)
-        created.append(m)
-        # 실시간 브로드캐스트
-        safe_group_send(
+        m = Message(room=room, user=user)
+        m.image.save(f.name, f, save=False)          # 저장소 I/O는 DB 트랜잭션 밖에서
+        msgs.append(m)
+
+    with transaction.atomic():
+        Message.objects.bulk_create(msgs)            # post_save 없음 → 행마다 acquire 하지 않음
+        if msgs and msgs[0].pk is None:
+            # MySQL은 bulk INSERT에서 id를 돌려주지 않음 → 같은 트랜잭션에서 방금 넣은 행을 1번 다시 읽어 채움
+            # (같은 사진 여러 장은 같은 파일명 → 한 INSERT 안의 id는 행 순서대로 증가하므로 id 오름차순으로 배정)
+            ids = defaultdict(list)
+            rows = (Message.objects
+                    .filter(room=room, user=user, created_at__gte=started,
+                            image__in={m.image.name for m in msgs})
+                    .order_by("id").values_list("image", "id"))
+            for name, pk in rows:
+                ids[name].append(pk)
+            for m in msgs:
+                m.pk = ids[m.image.name].pop(0) if ids[m.image.name] else None
+        ImageBlob.acquire_many([m.image.name for m in msgs])   # 참조 +1을 이름별로 한 번에
+        outbox.publish(
             f"room_{room.pk}",
             {
-                "type": "image",
-                "user": getattr(request.user, "username", str(request.user.pk)),
-                "image_url": m.image.url,
-                "message_id": m.id,
-                "ts": m.created_at.isoformat(),
-            }
+                "type": "image.batch",
+                "user": getattr(user, "username", str(user.pk)),
+                "items": [
+                    {"message_id": m.id, "image_url": m.image.url, "ts": m.created_at.isoformat()}
+                    for m in msgs
+                ],
+            },
         )
-    return JsonResponse({"ok": True, "count": len(created), "ids": [m.id for m in created]})
+
+        def _after_commit():
+            for m in msgs:
+                enqueue_image_processing(m.id, m.image.name)
+        transaction.on_commit(_after_commit)
+    return msgs
+
+
+def _publish_image_message(room: Room, user, m: Message) -> None:
+    """이미지 메시지 생성 직후 공통 처리: 방 그룹 브로드캐스트(아웃박스) + 커밋 후 리사이즈 예약."""
+    # 실시간 브로드캐스트
+    outbox.publish(
+        f"room_{room.pk}",
+        {
+            "type": "image",
+            "user": getattr(user, "username", str(user.pk)),
+            "image_url": m.image.url,
+            "message_id": m.id,
+            "ts": m.created_at.isoformat(),
+        }
+    )
+    # 커밋 이후에 후처리 예약(원본 파일/행이 확정된 뒤)
+    transaction.on_commit(lambda: enqueue_image_processing(m.id, m.image.name))
+
+
+# ------------------------------------------------------------
+# 청크 업로드(재개 가능): init → PUT 청크(offset) → finalize
+# - 청크는 요청 본문을 스트림으로 읽어 임시 파일의 offset 위치에 바로 기록(메모리 누적 X)
+# - 세션 상태(offset 등)는 캐시(Redis)에 보관 → 끊겼다가 GET으로 offset 확인 후 이어 보내기
+# ------------------------------------------------------------
+UPLOAD_MAX_CHUNK = 8 * 1024 * 1024           # 청크 1개 최대 크기
+UPLOAD_STREAM_BLOCK = 64 * 1024              # 본문 스트림 읽기 단위
+
+
+UPLOAD_LOCK_TTL = 120                        # 청크 기록/마무리 중 잠금(요청이 죽어도 이 시간 뒤 풀림)
+
+
+def _image_name(filename: str, ext: str) -> str:
+    """저장 이름: 클라 파일명의 앞부분 + 실제 내용으로 판별한 확장자."""
+    stem = os.path.splitext(os.path.basename(filename or ""))[0][:80]
+    return f"{stem or 'image'}{ext}"
+
+
+def _upload_key(upload_id: str) -> str:
+    return f"chunked_upload:{upload_id}"
+
+
+def _upload_lock(upload_id: str) -> str:
+    return f"chunked_upload:{upload_id}:lock"
+
+
+def _upload_path(upload_id: str) -> str:
+    return os.path.join(upload_temp_dir(), f"{upload_id}.part")
+
+
+def _load_upload(request, room: Room, upload_id: str):
+    """세션 조회 + 소유자/방 확인. 실패 시 (None, JsonResponse)."""
+    if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+        return None, JsonResponse({"ok": False, "error": "잘못된 업로드 ID입니다."}, status=400)
+    sess = cache.get(_upload_key(upload_id))
+    if not sess or sess["room_id"] != room.pk or sess["user_id"] != request.user.pk:
+        return None, JsonResponse({"ok": False, "error": "업로드 세션이 없거나 만료되었습니다."}, status=404)
+    return sess, None
+
+
+@require_POST
+@login_required
+def api_upload_init(request, slug):
+    """
+    청크 업로드 시작.
+    요청(JSON): {"filename": "a.jpg", "size": 12345678}
+    응답: {"ok":true,"upload_id":"...","offset":0,"chunk_size":N}
+    """
+    room = get_object_or_404(Room, slug=slug)
+    ok, reason = room.can_enter(request.user)
+    if not ok:
+        return JsonResponse({"ok": False, "error": reason}, status=403)
+
+    try:
+        data = json.loads(request.body.decode() or "{}")
+        size = int(data.get("size") or 0)
+    except (ValueError, TypeError):
+        return JsonResponse({"ok": False, "error": "잘못된 요청입니다."}, status=400)
+    filename = os.path.basename(str(data.get("filename") or "upload"))[:100]
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        return JsonResponse({"ok": False, "error": "허용되지 않는 파일 크기입니다."}, status=400)
+
+    upload_id = uuid.uuid4().hex
+    open(_upload_path(upload_id), "wb").close()      # 빈 임시 파일 선생성
+    cache.set(_upload_key(upload_id), {
+        "room_id": room.pk,
+        "user_id": request.user.pk,
+        "filename": filename,
+        "size": size,
+        "offset": 0,
+    }, UPLOAD_SESSION_TTL)
+    return JsonResponse({"ok": True, "upload_id": upload_id, "offset": 0, "chunk_size": UPLOAD_MAX_CHUNK})
+
+
+@login_required
+@require_http_methods(["GET", "PUT"])
+def api_upload_chunk(request, slug, upload_id):
+    """
+    GET: 현재까지 받은 offset 조회(재개용)
+    PUT ?offset=N: 본문(바이너리)을 임시 파일 N 위치에 기록. offset이 어긋나면 409 + 서버 offset
+    """
+    room = get_object_or_404(Room, slug=slug)
+    sess, err = _load_upload(request, room, upload_id)
+    if err:
+        return err
+
+    if request.method == "GET":
+        return JsonResponse({"ok": True, "offset": sess["offset"], "size": sess["size"]})
+
+    try:
+        offset = int(request.GET.get("offset", ""))
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "offset이 필요합니다."}, status=400)
+
+    # 같은 업로드에 동시에 온 PUT은 하나만(offset 확인~기록~갱신을 원자적으로)
+    if not cache.add(_upload_lock(upload_id), 1, UPLOAD_LOCK_TTL):
+        return JsonResponse({"ok": False, "error": "다른 청크를 받는 중입니다.", "offset": sess["offset"]}, status=409)
+    try:
+        sess, err = _load_upload(request, room, upload_id)     # 잠금 후 최신 상태로 다시 확인
+        if err:
+            return err
+        if offset != sess["offset"]:
+            return JsonResponse({"ok": False, "error": "offset 불일치", "offset": sess["offset"]}, status=409)
+
+        limit = min(UPLOAD_MAX_CHUNK, sess["size"] - offset)
+        written = 0
+        with open(_upload_path(upload_id), "r+b") as out:
+            out.seek(offset)
+            while True:
+                block = request.read(UPLOAD_STREAM_BLOCK)
+                if not block:
+                    break
+                written += len(block)
+                if written > limit:
+                    return JsonResponse({"ok": False, "error": "청크가 너무 큽니다.", "offset": offset}, status=413)
+                out.write(block)
+            out.truncate(offset + written)               # 이전 시도의 꼬리 데이터 제거
+
+        sess["offset"] = offset + written
+        cache.set(_upload_key(upload_id), sess, UPLOAD_SESSION_TTL)
+    finally:
+        cache.delete(_upload_lock(upload_id))
+    return JsonResponse({"ok": True, "offset": sess["offset"]})
+
+
+@require_POST
+@login_required
+def api_upload_finalize(request, slug, upload_id):
+    """
+    모든 청크 수신 후 Message 생성 + 브로드캐스트.
+    응답: {"ok":true,"id":message_id,"image_url":"..."}
+    """
+    room = get_object_or_404(Room, slug=slug)
+    ok, reason = room.can_enter(request.user)
+    if not ok:
+        return JsonResponse({"ok": False, "error": reason}, status=403)
+    sess, err = _load_upload(request, room, upload_id)
+    if err:
+        return err
+    if not cache.add(_upload_lock(upload_id), 1, UPLOAD_LOCK_TTL):
+        return JsonResponse({"ok": False, "error": "업로드를 처리하는 중입니다.", "offset": sess["offset"]}, status=409)
+    path = _upload_path(upload_id)
+    try:
+        sess, err = _load_upload(request, room, upload_id)     # 잠금 후 다시 확인(중복 finalize 방지)
+        if err:
+            return err
+        if sess["offset"] != sess["size"]:
+            return JsonResponse({"ok": False, "error": "아직 전송되지 않은 청크가 있습니다.", "offset": sess["offset"]}, status=409)
+
+        with open(path, "rb") as fh:
+            ext = detect_upload_ext(fh)
+            if ext is None:
+                _discard_upload(upload_id)               # 내용이 이미지가 아님 → 재시도해도 같으므로 정리
+                return JsonResponse({"ok": False, "error": "이미지 파일이 아닙니다."}, status=400)
+            m = Message(room=room, user=request.user)
+            m.image.save(_image_name(sess["filename"], ext), File(fh), save=False)   # 저장소가 스트리밍으로 해시/저장
+        with transaction.atomic():                       # 메시지와 아웃박스 행을 함께 커밋
+            m.save()
+            _publish_image_message(room, request.user, m)
+    finally:
+        cache.delete(_upload_lock(upload_id))
+
+    # 성공했을 때만 세션/임시 파일 정리(실패하면 같은 upload_id로 finalize 재시도 가능)
+    _discard_upload(upload_id)
+    return JsonResponse({"ok": True, "id": m.id, "image_url": m.image.url, "ts": m.created_at.isoformat()})
+
+
+def _discard_upload(upload_id: str) -> None:
+    cache.delete(_upload_key(upload_id))
+    try:
+        os.remove(_upload_path(upload_id))
+    except OSError:
+        pass
 
 
 @require_POST
@@ -433,31 +678,16 @@ def api_image_delete(request, slug, message_id: int):
 
     msg_id = msg.id
     img_url = msg.image.url if msg.image else None
-    image_path = msg.image.path if msg.image else None
-
-    msg.delete()
-
-    # 실제 파일 삭제(선택)
-    if image_path:
-        try:
-            import os
-            if os.path.exists(image_path):
-                os.remove(image_path)
-        except Exception:
-            logger.warning("파일 삭제 실패: %s", image_path)
 
-    safe_group_send(
-        f"room_{room.pk}",
-        {
-            "type": "room.event",
-            "payload": {
-                "action": "image.deleted",
-                "message_id": msg_id,
-                "image_url": img_url,
-                "ts": timezone.now().isoformat(),
-            },
-        },
-    )
+    # 파일은 여러 메시지가 공유할 수 있음 → 마지막 참조가 사라질 때만 삭제(signals.on_message_delete)
+    with transaction.atomic():
+        msg.delete()
+        outbox.publish(f"room_{room.pk}", {"type": "room.event", "payload": {
+            "action": "image.deleted",
+            "message_id": msg_id,
+            "image_url": img_url,
+            "ts": timezone.now().isoformat(),
+        }})
     return JsonResponse({"ok": True})
 
 @login_required
@@ -9,13 +9,19 @@ django_asgi_app = get_asgi_application()
 # ↑ 2) 여기서 Django를 부팅(앱 로딩 완료). 그 다음에야 앱 코드 import 가능
 
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 
 import collab.routing  # ↑ 3) 이제 import! (websocket_urlpatterns 읽어오기)
+from django.conf import settings
+from collab.media_serving import MediaFilesApp
+from accounts.ws_auth import WsTokenAuthMiddleware
+from collab.outbox import OutboxDispatcherApp
 
-application = ProtocolTypeRouter({
-    "http": django_asgi_app,                    # HTTP는 기존 Django 처리
-    "websocket": AuthMiddlewareStack(
+http_app = MediaFilesApp(django_asgi_app) if settings.MEDIA_SERVE_ASGI else django_asgi_app
+
+# 아웃박스 디스패처는 첫 요청 때 이 프로세스 이벤트 루프에서 시작(HTTP 전용 워커 포함)
+application = OutboxDispatcherApp(ProtocolTypeRouter({
+    "http": http_app,                           # /media/ 는 MediaFilesApp, 나머지 HTTP는 기존 Django 처리
+    "websocket": WsTokenAuthMiddleware(         # ?wst= 토큰 있으면 DB 없이 인증, 없으면 AuthMiddlewareStack
         URLRouter(collab.routing.websocket_urlpatterns)  # /ws/rooms/<slug>/ → Consumer
     ),
-})
+}))
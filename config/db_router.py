@@ -0,0 +1,138 @@
+# config/db_router.py
+"""
+읽기 복제본(replica) 라우팅 + 본인 쓰기 직후 읽기 보장(read-your-writes).
+- 기본은 전부 primary. replica_reads() 안(또는 @replica_view GET 요청)에서만 읽기를 replica로
+  → 목록/조회 위주 경로만 골라서 보냄(권한 검사·잠금 읽기 등은 그대로 primary)
+- 쓰기는 항상 primary. 사용자가 뭔가 쓰면 REPLICA_STICKY_SECONDS 동안 그 사용자의 읽기는 primary
+  (복제 지연 동안 "방금 보낸 채팅/만든 방이 안 보이는" 문제 방지). 표시는 캐시(Redis) 키 1개
+- 사용자 바인딩: HTTP는 ReplicaStickinessMiddleware, WS 컨슈머는 connect에서 bind_user()
+  (contextvars라 sync_to_async/db_write 스레드까지 따라감)
+settings에 "replica" DB가 없으면 아무것도 안 바뀜(전부 primary).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = "default"
+REPLICA = "replica"
+STICKY_KEY = "db_sticky:user:{uid}"
+NON_STICKY_APPS = {"sessions"}      # 세션 만료 연장 기록은 "사용자의 쓰기"로 치지 않음
+
+_use_replica: ContextVar[bool] = ContextVar("db_use_replica", default=False)
+_actor: ContextVar = ContextVar("db_actor", default=None)     # _Actor | None
+
+
+class _Actor:
+    """현재 요청/접속의 사용자 + 스티키 상태 메모(쿼리마다 Redis를 보지 않도록)."""
+    __slots__ = ("get_uid", "sticky_until", "checked_at", "marked_at")
+
+    def __init__(self, get_uid):
+        self.get_uid = get_uid          # 지연 평가(request.user 로드를 필요할 때까지 미룸)
+        self.sticky_until = 0.0
+        self.checked_at = None          # 마지막 캐시 확인 시각(None = 아직)
+        self.marked_at = 0.0
+
+    def uid(self):
+        try:
+            return self.get_uid()
+        except Exception:
+            return None
+
+
+def _sticky_seconds() -> float:
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+
+def bind_user(user_or_uid) -> None:
+    """이 컨텍스트(요청/컨슈머 태스크)의 사용자를 지정."""
+    uid = getattr(user_or_uid, "pk", user_or_uid)
+    _actor.set(_Actor(lambda: uid))
+
+
+@contextmanager
+def replica_reads():
+    """이 블록의 읽기는 replica로(단, 최근에 쓴 사용자는 primary)."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_view(view):
+    """GET/HEAD 요청일 때만 뷰 전체 읽기를 replica로."""
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return inner
+
+
+def _is_sticky(actor: _Actor) -> bool:
+    # 요청은 1번만, 오래 사는 WS 접속은 스티키 구간마다 다시 확인(다른 탭에서 쓴 것 반영)
+    now = time.time()
+    if actor.checked_at is None or now - actor.checked_at > _sticky_seconds():
+        uid = actor.uid()
+        ts = cache.get(STICKY_KEY.format(uid=uid)) if uid else None
+        actor.sticky_until = max(actor.sticky_until, (ts + _sticky_seconds()) if ts else 0.0)
+        actor.checked_at = now
+    return now < actor.sticky_until
+
+
+def _mark_write(actor: _Actor) -> None:
+    # 같은 요청/접속에서 여러 번 써도 Redis 기록은 (스티키 구간 절반마다) 1번
+    now = time.time()
+    if now - actor.marked_at < _sticky_seconds() / 2:
+        return
+    uid = actor.uid()
+    if not uid:
+        return
+    cache.set(STICKY_KEY.format(uid=uid), now, _sticky_seconds())
+    actor.marked_at = now
+    actor.sticky_until = now + _sticky_seconds()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or REPLICA not in settings.DATABASES:
+            return PRIMARY
+        actor = _actor.get()
+        if actor is not None and _is_sticky(actor):
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        actor = _actor.get()
+        if (actor is not None and REPLICA in settings.DATABASES
+                and model._meta.app_label not in NON_STICKY_APPS):
+            _mark_write(actor)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True                     # 같은 데이터의 복제본
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaStickinessMiddleware:
+    """요청 사용자를 라우터에 바인딩(AuthenticationMiddleware 뒤)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def _uid():
+            user = request.user
+            return user.pk if user.is_authenticated else None
+        token = _actor.set(_Actor(_uid))
+        try:
+            return self.get_response(request)
+        finally:
+            _actor.reset(token)
@@ -0,0 +1,94 @@
+# config/mysql_pool/base.py
+"""
+커넥션 풀을 쓰는 MySQL 백엔드 (ENGINE = "config.mysql_pool").
+Django 기본 mysql 백엔드와 같고, 연결/종료만 다름:
+- connect(): 새로 TCP+인증 하지 않고 접속 대상(alias, HOST, PORT, NAME, USER)별 프로세스 풀에서 빌림(스레드마다 1개)
+  → 테스트 DB(test_<NAME>)로 바뀌거나 설정이 바뀌면 다른 풀 — 예전 대상의 커넥션을 다시 쓰지 않음
+- close():   실제로 끊지 않고 롤백 후 풀에 반납(롤백 실패 = 망가진 커넥션 → 폐기)
+CONN_MAX_AGE=0 그대로 두면 요청/컨슈머 호출이 끝날 때마다 반납 → 스레드가 많아도 커넥션 수는 max_size 이하.
+설정: DATABASES[...]["OPTIONS"]["pool"] = {"max_size": .., "timeout": .., "check_idle": .., "max_lifetime": ..}
+"""
+import threading
+
+from django.db.backends.mysql import base as mysql_base
+from django.test.signals import setting_changed
+
+from .pool import ConnectionPool, PoolTimeout
+
+Database = mysql_base.Database
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(alias: str, settings_dict: dict) -> tuple:
+    return (alias, *(str(settings_dict.get(k) or "") for k in ("HOST", "PORT", "NAME", "USER")))
+
+
+def _get_pool(key: tuple, options: dict) -> ConnectionPool:
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**options)
+    return pool
+
+
+def close_pools() -> None:
+    """이 프로세스의 풀을 전부 폐기(유휴 커넥션 닫기, 빌려준 커넥션은 반납 때 닫힘)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats() -> dict:
+    """이 프로세스의 접속 대상별 풀 지표(키: alias user@host:port/name)."""
+    return {
+        f"{alias} {user}@{host}:{port}/{name}": pool.snapshot()
+        for (alias, host, port, name, user), pool in list(_pools.items())
+    }
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self._pool_options = params.pop("pool", None) or {}     # connect()에 넘기면 안 되는 키
+        return params
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return _get_pool(_pool_key(self.alias, self.settings_dict), getattr(self, "_pool_options", {}))
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        try:
+            conn = pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e)) from e      # wrap_database_errors → django.db.OperationalError
+        self._checked_out_from = pool        # 반납은 빌려온 풀로(그 사이 설정이 바뀌어도)
+        return conn
+
+    def _close(self):
+        conn = self.connection
+        if conn is None:
+            return
+        try:
+            conn.rollback()              # 열린 트랜잭션/락을 남긴 채 다른 스레드에 넘기지 않음
+            healthy = True
+        except Exception:
+            healthy = False
+        pool = getattr(self, "_checked_out_from", None) or self.pool
+        self._checked_out_from = None
+        pool.checkin(conn, discard=not healthy)
+
+
+def _on_setting_changed(setting, **kwargs):
+    # 테스트의 override_settings(DATABASES=...) 등: 예전 대상의 유휴 커넥션을 남겨두지 않음
+    if setting == "DATABASES":
+        close_pools()
+
+
+setting_changed.connect(_on_setting_changed)
@@ -0,0 +1,136 @@
+# config/mysql_pool/pool.py
+"""
+프로세스 단위 MySQL 커넥션 풀(스레드 안전).
+- 크기 제한(max_size): 동시에 빌려줄 수 있는 커넥션 수. 다 쓰고 있으면 timeout초 대기 후 PoolTimeout
+- LIFO 재사용: 최근에 반납된(따뜻한) 커넥션부터 꺼냄 → 안 쓰는 커넥션은 자연스럽게 오래 쉬다가 정리
+- 헬스 체크: check_idle초 넘게 쉬었던 커넥션은 꺼낼 때 ping, 죽었으면 버리고 다른 것/새 것
+- 수명(max_lifetime): MySQL wait_timeout보다 짧게 → 서버가 먼저 끊는 일 방지
+- 지표: snapshot() (생성/재사용/폐기/대기/타임아웃 횟수, 사용 중/유휴 개수)
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+logger = logging.getLogger("django.db.backends")
+
+
+class PoolTimeout(Exception):
+    """풀이 가득 차서 timeout 안에 커넥션을 못 빌림."""
+
+
+class ConnectionPool:
+    def __init__(self, *, max_size: int = 10, timeout: float = 5.0,
+                 check_idle: float = 30.0, max_lifetime: float = 1800.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: deque = deque()          # (conn, born, last_used)
+        self._born: dict = {}                # id(conn) → 생성 시각 (빌려준 커넥션)
+        self.closed = False                  # close() 후: 반납되는 커넥션은 보관하지 않고 닫음
+        self._stats = {
+            "checkouts": 0, "created": 0, "reused": 0, "discarded": 0,
+            "pings": 0, "waits": 0, "timeouts": 0, "wait_seconds": 0.0,
+        }
+
+    # ── 빌리기/반납 ──
+    def checkout(self, connect: Callable):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise PoolTimeout(f"connection pool exhausted (max_size={self.max_size}, timeout={self.timeout}s)")
+        try:
+            conn, born = self._take_idle()
+            if conn is None:
+                conn, born = connect(), time.monotonic()
+                self._count("created")
+            else:
+                self._count("reused")
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._born[id(conn)] = born
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += time.monotonic() - started
+        return conn
+
+    def checkin(self, conn, *, discard: bool = False) -> None:
+        try:
+            with self._lock:
+                born = self._born.pop(id(conn), None)
+            now = time.monotonic()
+            if discard or self.closed or born is None or now - born > self.max_lifetime:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, born, now))
+        finally:
+            self._slots.release()
+
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None, None
+                conn, born, last_used = self._idle.pop()
+            now = time.monotonic()
+            if now - born > self.max_lifetime:
+                self._discard(conn)
+                continue
+            if now - last_used > self.check_idle and not self._ping(conn):
+                self._discard(conn)
+                continue
+            return conn, born
+
+    def _ping(self, conn) -> bool:
+        self._count("pings")
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            logger.info("pooled connection failed health check, discarding")
+            return False
+
+    def _discard(self, conn) -> None:
+        self._count("discarded")
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    # ── 정리/지표 ──
+    def clear(self) -> None:
+        """유휴 커넥션 전부 닫기(빌려준 것은 반납 때 정상 처리)."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def close(self) -> None:
+        """풀 폐기: 유휴 커넥션을 닫고, 빌려준 것도 반납될 때 닫음."""
+        self.closed = True
+        self.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                max_size=self.max_size,
+                in_use=len(self._born),
+                idle=len(self._idle),
+            )
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        return stats
@@ -0,0 +1,13 @@
+# config/mysql_pool/views.py
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .base import pool_stats
+
+
+@staff_member_required
+@require_GET
+def db_pool_stats(request):
+    """이 워커 프로세스의 DB 커넥션 풀 지표(운영 확인용, 스태프 전용)."""
+    return JsonResponse({"pools": pool_stats()})
@@ -74,6 +74,10 @@ CHANNEL_LAYERS = {
         "CONFIG": {
             "hosts": [REDIS_URL],                            # ← hosts는 CONFIG 안에!
             # 필요 시 옵션 예: "capacity": 1000, "expiry": 60
+            # 컨슈머 기본 채널 큐 용량: control + chat/draw 레인 봉투가 모두 여기로 옴(collab/lanes.py)
+            "channel_capacity": {
+                "specific.*": 500,
+            },
         },
     }
 }
@@ -82,7 +86,9 @@ CHANNEL_LAYERS = {
 
 
 
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# 캐시(Redis) 우선 읽기 + DB 영속, 변경/만료 연장 때만 기록 (accounts/sessions.py)
+SESSION_ENGINE = "accounts.sessions"
+SESSION_TOUCH_INTERVAL = 300      # 변경 없는 요청은 이 간격(초)마다 한 번만 만료 연장 기록
 
 
 
@@ -92,6 +98,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.db_router.ReplicaStickinessMiddleware",   # 요청 사용자 → DB 라우터(본인 쓰기 직후엔 primary 읽기)
     "allauth.account.middleware.AccountMiddleware",   # ★ AuthMiddleware 바로 뒤 (세션/유저 활용)
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -105,6 +112,10 @@ CACHES = {
 }
 SESSION_SAVE_EVERY_REQUEST = True
 
+# WS 접속 토큰(accounts/ws_auth.py): 방 페이지가 발급, 세션/유저 DB 조회 없이 WS 인증
+WS_TOKEN_MAX_AGE = 120            # 토큰 유효 시간(초) — 지나면 세션 인증으로 대체
+WS_PROFILE_TTL = 60 * 10          # 캐시된 최소 프로필(id/username/is_active) 수명(초)
+
 ROOT_URLCONF = "config.urls"
 
 # ──────────────────────────────────────────────────────────────────────
@@ -174,21 +185,47 @@ DB_PASSWORD = _req("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 
+# 커넥션 풀 MySQL 백엔드(config/mysql_pool): 요청/컨슈머마다 TCP+인증 대신 풀에서 빌리고 반납
+# max_size ≥ 컨슈머 DB 풀(CONSUMER_DB_WORKERS) + 요청 처리 스레드 여유분
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "config.mysql_pool",
         "NAME": DB_NAME,
         "USER": DB_USER,
         "PASSWORD": DB_PASSWORD,
         "HOST": DB_HOST,
         "PORT": DB_PORT,
+        "CONN_MAX_AGE": 0,            # 끝날 때마다 close → 실제로는 풀에 반납
         "OPTIONS": {
             "charset": "utf8mb4",
             "init_command": "SET sql_mode='STRICT_TRANS_TABLES', time_zone = '+00:00'",
+            "pool": {
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": 5.0,           # 풀이 가득 찼을 때 대기 한도(초) → 넘으면 OperationalError
+                "check_idle": 30.0,       # 이보다 오래 쉰 커넥션은 꺼낼 때 ping
+                "max_lifetime": 1800.0,   # MySQL wait_timeout(기본 8시간)보다 짧게
+            },
         },
     }
 }
 
+# 읽기 복제본(선택): DB_REPLICA_HOST가 있으면 "replica" 별칭 추가 → config/db_router.py가 목록/조회 경로 읽기만 보냄
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.getenv("DB_REPLICA_PORT", DB_PORT),
+        "TEST": {"MIRROR": "default"},    # 테스트에서는 primary를 복제본처럼 사용
+    }
+DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+REPLICA_STICKY_SECONDS = 5           # 사용자가 쓴 뒤 이 시간(초) 동안 그 사용자의 읽기는 primary(복제 지연 대비)
+
+# WS 컨슈머 DB 쓰기 전용 스레드 풀 크기(collab/dbexec.py) = 프로세스당 추가로 열리는 최대 커넥션 수
+CONSUMER_DB_WORKERS = int(os.getenv("CONSUMER_DB_WORKERS", "8"))
+
 # ──────────────────────────────────────────────────────────────────────
 # 사용자 모델
 # ──────────────────────────────────────────────────────────────────────
@@ -229,6 +266,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# /media/ 를 ASGI 단에서 직접 서빙(ETag/Range/immutable 캐시, collab/media_serving.py)
+# 기본은 DEBUG일 때만(운영은 Nginx/S3). 운영에서 직접 서빙하려면 MEDIA_SERVE_ASGI=1
+MEDIA_SERVE_ASGI = bool(int(os.getenv("MEDIA_SERVE_ASGI", "1" if DEBUG else "0")))
+
+# 업로드 이미지 리사이즈(WebP/AVIF 변형본) 프로세스 풀 크기
+IMAGE_PIPELINE_WORKERS = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
+# 청크(재개 가능) 업로드 최대 파일 크기(바이트)
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE", str(50 * 1024 * 1024)))
 
 # ──────────────────────────────────────────────────────────────────────
 # 이메일 (개발: 콘솔 출력)
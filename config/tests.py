@@ -0,0 +1,171 @@
+import contextvars
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from collab.models import Message
+from config.db_router import (
+    PRIMARY, REPLICA, PrimaryReplicaRouter, bind_user, replica_reads,
+)
+from config.mysql_pool.pool import ConnectionPool, PoolTimeout
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+WITH_REPLICA = {PRIMARY: settings.DATABASES[PRIMARY], REPLICA: settings.DATABASES[PRIMARY]}
+WITHOUT_REPLICA = {PRIMARY: settings.DATABASES[PRIMARY]}
+
+
+def _fresh(fn, *args):
+    """contextvars(바인딩된 사용자/replica 플래그)가 테스트끼리 새지 않도록 새 컨텍스트에서 실행."""
+    return contextvars.Context().run(fn, *args)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, REPLICA_STICKY_SECONDS=5)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+
+    def _read(self):
+        with replica_reads():
+            return self.router.db_for_read(Message)
+
+    @override_settings(DATABASES=WITHOUT_REPLICA)
+    def test_replica_reads_without_replica_use_primary(self):
+        def run():
+            bind_user(1)
+            return self._read()
+        self.assertEqual(_fresh(run), PRIMARY)
+
+    @override_settings(DATABASES=WITH_REPLICA)
+    def test_reads_outside_replica_block_use_primary(self):
+        self.assertEqual(_fresh(self.router.db_for_read, Message), PRIMARY)
+
+    @override_settings(DATABASES=WITH_REPLICA)
+    def test_replica_reads_use_replica(self):
+        def run():
+            bind_user(1)
+            return self._read()
+        self.assertEqual(_fresh(run), REPLICA)
+
+    @override_settings(DATABASES=WITH_REPLICA)
+    def test_writes_go_to_primary(self):
+        def run():
+            bind_user(1)
+            with replica_reads():
+                return self.router.db_for_write(Message)
+        self.assertEqual(_fresh(run), PRIMARY)
+
+    @override_settings(DATABASES=WITH_REPLICA)
+    def test_reads_stick_to_primary_after_write(self):
+        def write_then_read():
+            bind_user(1)
+            self.router.db_for_write(Message)
+            return self._read()
+        self.assertEqual(_fresh(write_then_read), PRIMARY)
+
+        # 같은 사용자의 다른 요청/접속도 스티키 구간 동안 primary (캐시 표시 공유)
+        def other_request():
+            bind_user(1)
+            return self._read()
+        self.assertEqual(_fresh(other_request), PRIMARY)
+
+        # 다른 사용자는 영향 없음
+        def other_user():
+            bind_user(2)
+            return self._read()
+        self.assertEqual(_fresh(other_user), REPLICA)
+
+    @override_settings(DATABASES=WITH_REPLICA)
+    def test_session_writes_are_not_sticky(self):
+        def run():
+            bind_user(1)
+            self.router.db_for_write(Session)
+            return self._read()
+        self.assertEqual(_fresh(run), REPLICA)
+
+
+class FakeConnection:
+    def __init__(self, ping_ok=True):
+        self.ping_ok = ping_ok
+        self.closed = False
+
+    def ping(self, reconnect=True):
+        if not self.ping_ok:
+            raise ConnectionError("gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch("config.mysql_pool.pool.time.monotonic", side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.checkout(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        self.assertEqual(pool.snapshot()["timeouts"], 1)
+
+    def test_checkin_reuses_last_returned(self):
+        pool = ConnectionPool(max_size=2)
+        a, b = pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        pool.checkin(a)
+        pool.checkin(b)
+        self.assertIs(pool.checkout(FakeConnection), b)     # LIFO
+        self.assertEqual(pool.snapshot()["reused"], 1)
+
+    def test_checkin_past_max_lifetime_discards(self):
+        pool = ConnectionPool(max_lifetime=60)
+        conn = pool.checkout(FakeConnection)
+        self.now += 61
+        pool.checkin(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.snapshot()["idle"], 0)
+
+    def test_idle_past_max_lifetime_is_not_reused(self):
+        pool = ConnectionPool(max_lifetime=60, check_idle=3600)
+        old = pool.checkout(FakeConnection)
+        self.now += 30
+        pool.checkin(old)
+        self.now += 31
+        fresh = pool.checkout(FakeConnection)
+        self.assertIsNot(fresh, old)
+        self.assertTrue(old.closed)
+
+    def test_failed_ping_discards_and_connects_new(self):
+        pool = ConnectionPool(check_idle=10)
+        dead = pool.checkout(lambda: FakeConnection(ping_ok=False))
+        pool.checkin(dead)
+        self.now += 11
+        conn = pool.checkout(FakeConnection)
+        self.assertIsNot(conn, dead)
+        self.assertTrue(dead.closed)
+        stats = pool.snapshot()
+        self.assertEqual((stats["pings"], stats["discarded"], stats["created"]), (1, 1, 2))
+
+    def test_checkin_after_close_closes_connection(self):
+        pool = ConnectionPool(max_size=1)
+        idle = pool.checkout(FakeConnection)
+        pool.checkin(idle)
+        borrowed = pool.checkout(FakeConnection)
+        pool.close()
+        pool.checkin(borrowed)
+        self.assertTrue(borrowed.closed)
+        self.assertEqual(pool.snapshot()["idle"], 0)
+
+    def test_failed_connect_releases_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+
+        def broken():
+            raise ConnectionError("refused")
+        with self.assertRaises(ConnectionError):
+            pool.checkout(broken)
+        self.assertIsInstance(pool.checkout(FakeConnection), FakeConnection)
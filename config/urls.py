@@ -4,6 +4,7 @@ from django.conf import settings                         # DEBUG / MEDIA 설정
 from django.conf.urls.static import static               # 개발 시 미디어 서빙
 from django.views.generic import RedirectView            # 간단 리다이렉트 뷰
 from django.urls import reverse_lazy                     # URL name → 실제 URL
+from config.mysql_pool.views import db_pool_stats        # DB 커넥션 풀 지표(스태프 전용)
 from accounts.views import (
     CustomSocialSignupView,
     MyPasswordChangeView,
@@ -40,6 +41,8 @@ urlpatterns = [
 
     path('mypage/', CustomSocialSignupView.mypage, name='mypage'),  # 마이페이지
 
+    path('ops/db-pool/', db_pool_stats, name='ops_db_pool'),       # 워커별 DB 풀 지표(JSON)
+
 ]
 
 # 개발환경에서만 미디어 서빙 (운영은 Nginx/S3 등 사용)
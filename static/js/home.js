@@ -2,11 +2,19 @@
 (() => {
   const list = document.getElementById("room-list");
   if (!list) return;
+  // 검색 결과/다음 페이지에선 스냅샷·새 방으로 목록을 덮어쓰지 않음(카드 갱신만)
+  const LIVE_LIST = list.dataset.live === "1";
   
 
   // 1) WebSocket URL 구성
   const scheme = (location.protocol === "https:") ? "wss" : "ws";
-  const wsUrl = `${scheme}://${location.host}/ws/lobby/`;
+  // 페이지 쿼리의 로비 필터(topics=a,b / free=1)를 그대로 WS 구독 필터로 전달
+  const pageParams = new URLSearchParams(location.search);
+  const wsParams = new URLSearchParams();
+  if (pageParams.get("topics")) wsParams.set("topics", pageParams.get("topics"));
+  if (pageParams.get("free")) wsParams.set("free", pageParams.get("free"));
+  const wsQuery = wsParams.toString();
+  const wsUrl = `${scheme}://${location.host}/ws/lobby/${wsQuery ? `?${wsQuery}` : ""}`;
 
   // 2) 도우미: li 찾기 / 만들기
   function findItemBySlug(slug) {
@@ -27,8 +35,28 @@
     return bits.join(' · ');
   }
 
+  // 3-1) 현재 인원 표시(n/정원) — 카드의 .item__occ만 갱신
+  function renderOccupancy(li, occupancy, capacity) {
+    if (!li) return;
+    let occ = li.querySelector(".item__occ");
+    if (typeof occupancy !== "number") {
+      // 정원만 바뀐 경우: 이미 표시 중인 인원으로 다시 그림
+      if (!occ || typeof capacity !== "number") return;
+      occupancy = Number(occ.dataset.occupancy || 0);
+    }
+    if (!occ) {
+      occ = document.createElement("span");
+      occ.className = "item__occ muted";
+      li.querySelector(".item__title")?.after(occ);
+    }
+    occ.dataset.occupancy = String(occupancy);
+    if (typeof capacity === "number") occ.dataset.capacity = String(capacity);
+    const cap = occ.dataset.capacity;
+    occ.textContent = cap ? `👥 ${occupancy}/${cap}` : `👥 ${occupancy}`;
+  }
+
   // 4) 리스트 카드 생성/갱신(Upsert)
-  function upsertRoomCard({ id, slug, name, topic, owner, created_at, locked }) {
+  function upsertRoomCard({ id, slug, name, topic, owner, created_at, locked, occupancy, capacity }) {
     // li 찾기: data-room-slug가 주 식별자
     let li = findItemBySlug(slug);
 
@@ -55,6 +83,7 @@
            ${locked ? 'data-locked="1"' : ''}>입장</a>
       `;
       list.prepend(li);
+      renderOccupancy(li, occupancy, capacity);
       return;
     }
 
@@ -64,6 +93,7 @@
     const enter   = li.querySelector("a.enter-btn");
 
     if (titleEl && name) titleEl.textContent = name;
+    renderOccupancy(li, occupancy, capacity);
     if (metaEl) {
       // topic/owner/🔒 등 변경 분 반영
       metaEl.textContent = buildMeta({
@@ -109,6 +139,7 @@
     if (!ev) return;
     
     if (ev === "snapshot") {
+      if (!LIVE_LIST) return;
       const rooms = Array.isArray(data.rooms) ? data.rooms : [];
       const known = new Set();
       list.innerHTML = "";
@@ -122,6 +153,8 @@
           owner: room.owner,
           created_at: room.created_at,
           locked: room.requires_password,
+          occupancy: room.occupancy,
+          capacity: room.capacity,
         });
       });
       // 이미 있던 카드 중 스냅샷에 없는 것은 제거
@@ -132,6 +165,39 @@
       return;
     }
 
+    // 서버가 1초 단위로 묶어 보내는 방별 현재 인원
+    if (ev === "occupancy") {
+      (Array.isArray(data.rooms) ? data.rooms : []).forEach(r => {
+        renderOccupancy(findItemBySlug(r.room_slug || r.slug), r.occupancy, r.capacity);
+      });
+      return;
+    }
+
+    // 빈자리 필터(free=1) 구독 중 다시 자리가 난 방: 스냅샷과 같은 카드 전체가 옴
+    if (ev === "room_shown") {
+      if (!LIVE_LIST) return;
+      const room = data.room || {};
+      if (!room.slug) return;
+      upsertRoomCard({
+        id: room.id,
+        slug: room.slug,
+        name: room.name,
+        topic: room.topic,
+        owner: room.owner,
+        created_at: room.created_at,
+        locked: room.requires_password,
+        occupancy: room.occupancy,
+        capacity: room.capacity,
+      });
+      return;
+    }
+
+    // 구독 필터에서 벗어난 방(주제 변경/정원 마감): 알림 없이 목록에서만 제거
+    if (ev === "room_hidden") {
+      if (slug) removeRoomBySlug(slug);
+      return;
+    }
+
     if (ev === "room_deleted") {
       if (slug) removeRoomBySlug(slug);
       // (선택) 사용자에게 알림
@@ -142,6 +208,7 @@
     }
 
     if (ev === "room_created") {
+      if (!LIVE_LIST) return;
       upsertRoomCard({
         id, slug,
         name:   data.name   || data.room_name || slug,
@@ -154,12 +221,15 @@
     }
 
     if (ev === "room_updated") {
+      // 서버는 바뀐 필드만 보냄. 목록에 없는 방은 만들지 않음(빈 카드 방지)
+      if (!slug || !findItemBySlug(slug)) return;
       upsertRoomCard({
         id, slug,
         name:   data.name   || data.room_name,
         topic:  data.topic,
         owner:  data.owner  || data.owner_name,
         locked: (typeof data.locked === 'boolean') ? data.locked : undefined,
+        capacity: data.capacity,
       });
       return;
     }
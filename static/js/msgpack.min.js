@@ -0,0 +1,153 @@
+/*! msgpack.min.js — 방 WS msgpack 서브프로토콜용 최소 구현(외부 CDN 없이 자체 서빙)
+ *  window.MessagePack = { encode(value) → Uint8Array, decode(Uint8Array|ArrayBuffer) → value }
+ *  (@msgpack/msgpack UMD 빌드와 같은 전역 이름/함수 시그니처)
+ *  지원: nil/bool/int(53비트까지)/float64/str/bin/array/map, ext -1(timestamp) → Date
+ */
+(function (root) {
+  'use strict';
+  var te = new TextEncoder(), td = new TextDecoder();
+
+  function encode(value) {
+    var buf = new Uint8Array(256), view = new DataView(buf.buffer), pos = 0;
+
+    function ensure(n) {
+      if (pos + n <= buf.length) return;
+      var size = buf.length * 2;
+      while (size < pos + n) size *= 2;
+      var next = new Uint8Array(size);
+      next.set(buf);
+      buf = next; view = new DataView(buf.buffer);
+    }
+    function u8(v) { ensure(1); buf[pos++] = v; }
+    function u16(v) { ensure(2); view.setUint16(pos, v); pos += 2; }
+    function u32(v) { ensure(4); view.setUint32(pos, v); pos += 4; }
+    function bytes(b) { ensure(b.length); buf.set(b, pos); pos += b.length; }
+    function head(len, fix, fixMax, c8, c16, c32) {
+      if (fix !== null && len <= fixMax) u8(fix | len);
+      else if (c8 !== null && len < 0x100) { u8(c8); u8(len); }
+      else if (len < 0x10000) { u8(c16); u16(len); }
+      else { u8(c32); u32(len); }
+    }
+    function int(v) {
+      if (v >= 0) {
+        if (v < 0x80) u8(v);
+        else if (v < 0x100) { u8(0xcc); u8(v); }
+        else if (v < 0x10000) { u8(0xcd); u16(v); }
+        else if (v < 0x100000000) { u8(0xce); u32(v); }
+        else { u8(0xcf); u32(Math.floor(v / 0x100000000)); u32(v >>> 0); }
+      } else {
+        if (v >= -0x20) u8(v & 0xff);
+        else if (v >= -0x80) { u8(0xd0); ensure(1); view.setInt8(pos, v); pos += 1; }
+        else if (v >= -0x8000) { u8(0xd1); ensure(2); view.setInt16(pos, v); pos += 2; }
+        else if (v >= -0x80000000) { u8(0xd2); ensure(4); view.setInt32(pos, v); pos += 4; }
+        else { u8(0xd3); u32(Math.floor(v / 0x100000000) >>> 0); u32(v >>> 0); }
+      }
+    }
+    function walk(v) {
+      if (v === null || v === undefined) return u8(0xc0);
+      if (v === false) return u8(0xc2);
+      if (v === true) return u8(0xc3);
+      if (typeof v === 'number') {
+        if (Number.isSafeInteger(v)) return int(v);
+        u8(0xcb); ensure(8); view.setFloat64(pos, v); pos += 8; return;
+      }
+      if (typeof v === 'string') {
+        var s = te.encode(v);
+        head(s.length, 0xa0, 31, 0xd9, 0xda, 0xdb); return bytes(s);
+      }
+      if (v instanceof ArrayBuffer) v = new Uint8Array(v);
+      else if (ArrayBuffer.isView(v) && !(v instanceof Uint8Array)) v = new Uint8Array(v.buffer, v.byteOffset, v.byteLength);
+      if (v instanceof Uint8Array) { head(v.length, null, 0, 0xc4, 0xc5, 0xc6); return bytes(v); }
+      if (v instanceof Date) return walk(v.toISOString());
+      if (Array.isArray(v)) {
+        head(v.length, 0x90, 15, null, 0xdc, 0xdd);
+        for (var i = 0; i < v.length; i++) walk(v[i]);
+        return;
+      }
+      if (typeof v.toJSON === 'function') return walk(v.toJSON());
+      var keys = Object.keys(v).filter(function (k) { return v[k] !== undefined; });
+      head(keys.length, 0x80, 15, null, 0xde, 0xdf);
+      for (var j = 0; j < keys.length; j++) { walk(keys[j]); walk(v[keys[j]]); }
+    }
+
+    walk(value);
+    return buf.slice(0, pos);
+  }
+
+  function decode(input) {
+    var buf = input instanceof Uint8Array ? input : new Uint8Array(input);
+    var view = new DataView(buf.buffer, buf.byteOffset, buf.byteLength), pos = 0;
+
+    function need(n) { if (pos + n > buf.length) throw new RangeError('msgpack: 데이터가 잘림'); }
+    function u8() { need(1); return buf[pos++]; }
+    function u16() { need(2); var v = view.getUint16(pos); pos += 2; return v; }
+    function u32() { need(4); var v = view.getUint32(pos); pos += 4; return v; }
+    function raw(n) { need(n); var b = buf.subarray(pos, pos + n); pos += n; return b; }
+    function str(n) { return td.decode(raw(n)); }
+    function arr(n) { var out = new Array(n); for (var i = 0; i < n; i++) out[i] = read(); return out; }
+    function map(n) {
+      var out = {};
+      for (var i = 0; i < n; i++) { var k = read(); out[k] = read(); }
+      return out;
+    }
+    function ext(n) {
+      var type = view.getInt8((need(1), pos++)), data = raw(n);
+      if (type !== -1) throw new TypeError('msgpack: 지원하지 않는 ext 타입 ' + type);
+      var d = new DataView(data.buffer, data.byteOffset, data.byteLength);
+      if (n === 4) return new Date(d.getUint32(0) * 1000);
+      if (n === 8) {
+        var hi = d.getUint32(0), lo = d.getUint32(4);
+        return new Date(((hi & 0x3) * 0x100000000 + lo) * 1000 + (hi >>> 2) / 1e6);
+      }
+      return new Date((d.getInt32(4) * 0x100000000 + d.getUint32(8)) * 1000 + d.getUint32(0) / 1e6);
+    }
+    function read() {
+      var c = u8(), v;
+      if (c < 0x80) return c;
+      if (c < 0x90) return map(c & 0x0f);
+      if (c < 0xa0) return arr(c & 0x0f);
+      if (c < 0xc0) return str(c & 0x1f);
+      if (c >= 0xe0) return c - 0x100;
+      switch (c) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: return raw(u8());
+        case 0xc5: return raw(u16());
+        case 0xc6: return raw(u32());
+        case 0xc7: return ext(u8());
+        case 0xc8: return ext(u16());
+        case 0xc9: return ext(u32());
+        case 0xca: need(4); v = view.getFloat32(pos); pos += 4; return v;
+        case 0xcb: need(8); v = view.getFloat64(pos); pos += 8; return v;
+        case 0xcc: return u8();
+        case 0xcd: return u16();
+        case 0xce: return u32();
+        case 0xcf: return u32() * 0x100000000 + u32();
+        case 0xd0: need(1); v = view.getInt8(pos); pos += 1; return v;
+        case 0xd1: need(2); v = view.getInt16(pos); pos += 2; return v;
+        case 0xd2: need(4); v = view.getInt32(pos); pos += 4; return v;
+        case 0xd3: need(8); v = view.getInt32(pos) * 0x100000000 + view.getUint32(pos + 4); pos += 8; return v;
+        case 0xd4: return ext(1);
+        case 0xd5: return ext(2);
+        case 0xd6: return ext(4);
+        case 0xd7: return ext(8);
+        case 0xd8: return ext(16);
+        case 0xd9: return str(u8());
+        case 0xda: return str(u16());
+        case 0xdb: return str(u32());
+        case 0xdc: return arr(u16());
+        case 0xdd: return arr(u32());
+        case 0xde: return map(u16());
+        case 0xdf: return map(u32());
+      }
+      throw new TypeError('msgpack: 알 수 없는 타입 0x' + c.toString(16));
+    }
+
+    var value = read();
+    if (pos !== buf.length) throw new RangeError('msgpack: 남은 바이트 ' + (buf.length - pos));
+    return value;
+  }
+
+  root.MessagePack = { encode: encode, decode: decode };
+})(typeof self !== 'undefined' ? self : this);